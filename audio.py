@@ -0,0 +1,208 @@
+import discord
+import math
+import shlex
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FFMPEG_BEFORE_OPTIONS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin"
+FFMPEG_OPTIONS = "-vn"
+FRAMES_PER_SECOND = 50
+
+CROSSFADE_CURVES = {
+    "linear": lambda x: (1 - x, x),
+    "equal_power": lambda x: (np.cos(x * (math.pi / 2)), np.sin(x * (math.pi / 2))),
+    "smooth": lambda x: (1 - x * x * (3 - 2 * x), x * x * (3 - 2 * x)),
+}
+DEFAULT_CROSSFADE_CURVE = "equal_power"
+
+
+class TrackSource(discord.AudioSource):
+    def __init__(self, original: discord.AudioSource, started_at: float, on_first_frame=None):
+        self.original = original
+        self.started_at = started_at
+        self.first_frame_at = None
+        self._on_first_frame = on_first_frame
+
+    @property
+    def volume(self):
+        return getattr(self.original, 'volume', None)
+
+    @volume.setter
+    def volume(self, value: float):
+        if hasattr(self.original, 'volume'):
+            self.original.volume = value
+
+    def read(self) -> bytes:
+        data = self.original.read()
+        if data and self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+            if self._on_first_frame:
+                self._on_first_frame(self.first_frame_at - self.started_at)
+        return data
+
+    @property
+    def passthrough(self) -> bool:
+        return self.original.is_opus()
+
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def cleanup(self):
+        self.original.cleanup()
+
+
+def _before_options(stream: dict, position: float = 0) -> str:
+    before = FFMPEG_BEFORE_OPTIONS
+    if position:
+        before += f" -ss {position:.1f}"
+    headers = stream.get('http_headers')
+    if headers:
+        header_block = "".join(f"{key}: {value}\r\n" for key, value in headers.items())
+        before += f" -headers {shlex.quote(header_block)}"
+    return before
+
+
+def can_passthrough(stream: dict, volume: int) -> bool:
+    return stream.get('acodec') == 'opus' and volume == 100
+
+
+def crossfade_available() -> bool:
+    return np is not None
+
+
+class CrossfadeSource(discord.AudioSource):
+    PREPARE_LEAD_FRAMES = 10 * FRAMES_PER_SECOND
+    SAMPLES_PER_FRAME = discord.opus.Encoder.SAMPLES_PER_FRAME
+    CHANNELS = discord.opus.Encoder.CHANNELS
+
+    def __init__(self, current: TrackSource, total_frames: int, fade_seconds: float,
+                 curve: str = DEFAULT_CROSSFADE_CURVE, on_prepare=None, on_transition=None):
+        self.current = current
+        self.next = None
+        self.total_frames = total_frames
+        self.position = 0
+        self.fade_frames = max(1, int(fade_seconds * FRAMES_PER_SECOND))
+        self.curve = CROSSFADE_CURVES.get(curve, CROSSFADE_CURVES[DEFAULT_CROSSFADE_CURVE])
+        self.finished = False
+        self._on_prepare = on_prepare
+        self._prepare = on_prepare
+        self._on_transition = on_transition
+        self._next_total = 0
+        self._next_tag = None
+        self._next_position = 0
+        self._lock = threading.Lock()
+        self._ramp = np.repeat(
+            np.linspace(0, 1, self.SAMPLES_PER_FRAME, endpoint=False, dtype=np.float32),
+            self.CHANNELS
+        )
+
+    @property
+    def volume(self):
+        return self.current.volume
+
+    @volume.setter
+    def volume(self, value: float):
+        self.current.volume = value
+        if self.next:
+            self.next.volume = value
+
+    @property
+    def passthrough(self) -> bool:
+        return False
+
+    def queue_next(self, source: TrackSource, total_frames: int, tag=None) -> bool:
+        with self._lock:
+            if self.finished or self.next is not None:
+                return False
+            self.next = source
+            self._next_total = total_frames
+            self._next_tag = tag
+            self._next_position = 0
+            return True
+
+    def read(self) -> bytes:
+        with self._lock:
+            data = self.current.read()
+            self.position += 1
+            remaining = self.total_frames - self.position
+            
+            if self._on_prepare and remaining <= self.fade_frames + self.PREPARE_LEAD_FRAMES:
+                on_prepare, self._on_prepare = self._on_prepare, None
+                on_prepare()
+            
+            if self.next is None:
+                if not data:
+                    self.finished = True
+                return data
+            
+            if data and remaining > self.fade_frames:
+                return data
+            
+            incoming = self.next.read()
+            self._next_position += 1
+            if not data:
+                self._promote()
+                return incoming
+            if not incoming:
+                return data
+            
+            start = min(max(1 - remaining / self.fade_frames, 0.0), 1.0)
+            return self._mix(data, incoming, start, min(start + 1 / self.fade_frames, 1.0))
+
+    def _mix(self, outgoing: bytes, incoming: bytes, start: float, end: float) -> bytes:
+        outgoing_frame = np.frombuffer(outgoing, dtype=np.int16)
+        incoming_frame = np.frombuffer(incoming, dtype=np.int16)
+        if outgoing_frame.size != incoming_frame.size:
+            return incoming
+        
+        fade_out, fade_in = self.curve(start + self._ramp * (end - start))
+        mixed = outgoing_frame * fade_out + incoming_frame * fade_in
+        return np.clip(mixed, -32768, 32767).astype(np.int16).tobytes()
+
+    def _promote(self):
+        self.current.cleanup()
+        self.current, self.next = self.next, None
+        self.total_frames = self._next_total
+        self.position = self._next_position
+        self._on_prepare = self._prepare
+        if self._on_transition:
+            self._on_transition(self._next_tag)
+
+    def is_opus(self) -> bool:
+        return False
+
+    def cleanup(self):
+        with self._lock:
+            self.finished = True
+            self.current.cleanup()
+            if self.next:
+                self.next.cleanup()
+                self.next = None
+
+
+def create_source(stream: dict, volume: int, started_at: float, on_first_frame=None, position: float = 0,
+                  allow_passthrough: bool = True) -> TrackSource:
+    if allow_passthrough and can_passthrough(stream, volume):
+        opus = discord.FFmpegOpusAudio(
+            stream['url'],
+            codec='opus',
+            before_options=_before_options(stream, position),
+            options=FFMPEG_OPTIONS
+        )
+        return TrackSource(opus, started_at, on_first_frame)
+    
+    pcm = discord.FFmpegPCMAudio(
+        stream['url'],
+        before_options=_before_options(stream, position),
+        options=FFMPEG_OPTIONS
+    )
+    return TrackSource(
+        discord.PCMVolumeTransformer(pcm, volume=volume / 100),
+        started_at,
+        on_first_frame
+    )
@@ -0,0 +1,129 @@
+import asyncio
+from collections import OrderedDict
+import db
+from logger import log_error
+from track_index import normalize
+
+
+class PrefixTrie:
+    TOP_PER_NODE = 10
+    MAX_KEY_DEPTH = 12
+
+    def __init__(self, max_entries: int = 200):
+        self.max_entries = max_entries
+        self._root = {}
+        self._recent = OrderedDict()
+
+    def insert(self, name: str, value: str):
+        entry = (name[:100], value[:100])
+        self._recent.pop(entry, None)
+        self._recent[entry] = None
+        if len(self._recent) > self.max_entries:
+            self._rebuild(list(self._recent)[-(self.max_entries // 2):])
+            return
+        self._index(entry)
+
+    def remove(self, name: str):
+        self._rebuild([entry for entry in self._recent if entry[0] != name[:100]])
+
+    def search(self, prefix: str, limit: int = 25) -> list:
+        prefix = normalize(prefix)
+        node = self._root
+        for char in prefix[:self.MAX_KEY_DEPTH]:
+            node = node.get(char)
+            if node is None:
+                return []
+        
+        top = node.get('', [])
+        if len(prefix) > self.MAX_KEY_DEPTH:
+            top = [entry for entry in top if prefix in normalize(entry[0])]
+        return top[:limit]
+
+    def _index(self, entry: tuple):
+        words = normalize(entry[0]).split()
+        starts = {' '.join(words[i:]) for i in range(len(words))}
+        starts.add('')
+        for key in starts:
+            node = self._root
+            self._promote(node, entry)
+            for char in key[:self.MAX_KEY_DEPTH]:
+                node = node.setdefault(char, {})
+                self._promote(node, entry)
+
+    def _promote(self, node: dict, entry: tuple):
+        top = node.setdefault('', [])
+        if entry in top:
+            top.remove(entry)
+        top.insert(0, entry)
+        del top[self.TOP_PER_NODE:]
+
+    def _rebuild(self, entries: list):
+        self._root = {}
+        self._recent = OrderedDict((entry, None) for entry in entries)
+        for entry in entries:
+            self._index(entry)
+
+    def __len__(self):
+        return len(self._recent)
+
+
+class SuggestionIndex:
+    MAX_SCOPES = 5000
+
+    def __init__(self):
+        self._tracks = OrderedDict()
+        self._playlists = OrderedDict()
+        self._loaded_users = set()
+
+    def _trie(self, scopes: OrderedDict, key) -> PrefixTrie:
+        trie = scopes.get(key)
+        if trie is None:
+            trie = scopes[key] = PrefixTrie()
+            if len(scopes) > self.MAX_SCOPES:
+                scopes.popitem(last=False)
+        scopes.move_to_end(key)
+        return trie
+
+    def record_track(self, song: dict, user_id: int = None, guild_id: int = None):
+        if not song.get('url'):
+            return
+        name = f"{song['title']} — {song.get('artist') or 'Desconocido'}"
+        if user_id:
+            self._trie(self._tracks, ('user', user_id)).insert(name, song['url'])
+        if guild_id:
+            self._trie(self._tracks, ('guild', guild_id)).insert(name, song['url'])
+
+    def record_playlist(self, user_id: int, name: str):
+        self._trie(self._playlists, user_id).insert(name, name)
+
+    def forget_playlist(self, user_id: int, name: str):
+        self._trie(self._playlists, user_id).remove(name)
+
+    def tracks(self, user_id: int, guild_id: int, prefix: str, limit: int = 25) -> list:
+        self._ensure_user_loaded(user_id)
+        results = []
+        for scope in (('user', user_id), ('guild', guild_id)):
+            trie = self._tracks.get(scope)
+            if trie:
+                results.extend(entry for entry in trie.search(prefix, limit) if entry not in results)
+        return results[:limit]
+
+    def playlists(self, user_id: int, prefix: str, limit: int = 25) -> list:
+        self._ensure_user_loaded(user_id)
+        trie = self._playlists.get(user_id)
+        return trie.search(prefix, limit) if trie else []
+
+    def _ensure_user_loaded(self, user_id: int):
+        if user_id in self._loaded_users:
+            return
+        self._loaded_users.add(user_id)
+        asyncio.create_task(self._load_user(user_id))
+
+    async def _load_user(self, user_id: int):
+        try:
+            for favorite in reversed(await db.get_user_favorites(user_id, limit=50)):
+                self.record_track(favorite, user_id=user_id)
+            for playlist in reversed(await db.get_user_playlists(user_id)):
+                self.record_playlist(user_id, playlist['name'])
+        except Exception as e:
+            log_error(str(e), "load_suggestions")
@@ -0,0 +1,106 @@
+import gc
+import tempfile
+import tracemalloc
+from collections import defaultdict, deque
+from cogs.music import GuildPlayerState, MusicPlayer
+from config import QUEUE_HOT_SIZE
+from idle_tracker import IdleTracker
+from track_queue import SpillStore, TieredQueue
+
+GUILD_COUNTS = (10_000, 100_000)
+
+
+class DefaultDictPlayer:
+    def __init__(self):
+        self.queues = defaultdict(deque)
+        self.now_playing = {}
+        self.is_playing = defaultdict(bool)
+        self.is_paused = defaultdict(bool)
+        self.current_source = defaultdict(lambda: None)
+        self.loop_status = defaultdict(lambda: "off")
+        self.shuffle_enabled = defaultdict(bool)
+        self.volume = defaultdict(lambda: 100)
+        self.prefetched = defaultdict(dict)
+
+    def touch(self, guild_id: int):
+        self.queues[guild_id]
+        self.now_playing[guild_id] = None
+        self.is_playing[guild_id]
+        self.is_paused[guild_id]
+        self.current_source[guild_id]
+        self.loop_status[guild_id]
+        self.shuffle_enabled[guild_id]
+        self.volume[guild_id]
+        self.prefetched[guild_id]
+
+    def read(self, guild_id: int):
+        return self.is_playing[guild_id], self.loop_status[guild_id], self.queues[guild_id]
+
+
+def defaultdicts(count: int, store: SpillStore):
+    player = DefaultDictPlayer()
+    for guild_id in range(count):
+        player.touch(guild_id)
+    return player
+
+
+def slotted_states(count: int, store: SpillStore):
+    return {guild_id: GuildPlayerState(guild_id, deque(), 0) for guild_id in range(count)}
+
+
+def full_states(count: int, store: SpillStore):
+    guilds = {}
+    idle = IdleTracker(300)
+    for guild_id in range(count):
+        queue = TieredQueue(store, QUEUE_HOT_SIZE)
+        guilds[guild_id] = GuildPlayerState(guild_id, queue, MusicPlayer.MAX_HISTORY_PER_GUILD)
+        idle.touch(guild_id)
+    return guilds, idle
+
+
+def defaultdict_reads(count: int, store: SpillStore):
+    player = DefaultDictPlayer()
+    for guild_id in range(count):
+        player.read(guild_id)
+    return player
+
+
+def registry_reads(count: int, store: SpillStore):
+    guilds = {}
+    for guild_id in range(count):
+        guilds.get(guild_id)
+    return guilds
+
+
+CASES = (
+    ("defaultdicts", defaultdicts),
+    ("GuildPlayerState (deque queue)", slotted_states),
+    ("GuildPlayerState + TieredQueue + history + idle", full_states),
+    ("reads of unknown guilds, defaultdicts", defaultdict_reads),
+    ("reads of unknown guilds, get_state", registry_reads),
+)
+
+
+def measure(build, count: int, store: SpillStore) -> int:
+    gc.collect()
+    tracemalloc.start()
+    held = build(count, store)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SpillStore(f"{directory}/spill.sqlite3")
+        for count in GUILD_COUNTS:
+            print(f"{count} guilds")
+            for name, build in CASES:
+                size = measure(build, count, store)
+                print(f"  {name:<50} {size / 2**20:>8.1f} MB  {size // count:>6} B/guild")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
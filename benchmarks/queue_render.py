@@ -0,0 +1,83 @@
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from config import QUEUE_HOT_SIZE
+from track_queue import SpillStore, TieredQueue
+from tracks import Track
+from utils import create_queue_embed
+
+QUEUE_SIZES = (500, 10_000, 100_000)
+PER_PAGE = 8
+ROUNDS = 50
+
+
+def _tracks(count: int) -> list:
+    return [
+        Track.create(f"Song {index}", f"https://www.youtube.com/watch?v={index:011d}", 180, artist="Artist")
+        for index in range(count)
+    ]
+
+
+async def measure(render) -> tuple:
+    await render()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started_at = time.perf_counter()
+    for _ in range(ROUNDS):
+        await render()
+    return peak, (time.perf_counter() - started_at) / ROUNDS
+
+
+async def run(store: SpillStore, size: int):
+    tracks = _tracks(size)
+    copied = deque(tracks)
+    queue = TieredQueue(store, QUEUE_HOT_SIZE)
+    await queue.extend(tracks)
+    last_page = (size + PER_PAGE - 1) // PER_PAGE
+    cached = (0, 1, create_queue_embed(tracks[:PER_PAGE], 1, total=size))
+
+    def copy_render(page):
+        async def render():
+            return create_queue_embed(list(copied), page)
+        return render
+
+    def page_render(page):
+        async def render():
+            start = (page - 1) * PER_PAGE
+            return create_queue_embed(await queue.slice(start, start + PER_PAGE), page, total=len(queue))
+        return render
+
+    async def cached_render():
+        if cached[0] == 0 and cached[1] == 1:
+            return cached[2]
+
+    cases = (
+        ("copy whole queue, page 1", copy_render(1)),
+        ("copy whole queue, last page", copy_render(last_page)),
+        ("queue_page, page 1", page_render(1)),
+        ("queue_page, last page", page_render(last_page)),
+        ("cached embed", cached_render),
+    )
+    print(f"{size} tracks")
+    for name, render in cases:
+        peak, seconds = await measure(render)
+        print(f"  {name:<30} {peak / 1024:>9.1f} KiB peak  {seconds * 1000:>8.3f} ms")
+    await queue.clear()
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SpillStore(f"{directory}/spill.sqlite3")
+        for size in QUEUE_SIZES:
+            await run(store, size)
+        store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import gc
+import itertools
+import random
+import time
+import tracemalloc
+from tracks import Track
+
+GUILDS = 500
+TRACKS_PER_GUILD = 10_000
+CATALOG_SIZE = 100_000
+DICT_SAMPLE_GUILDS = 20
+
+
+def _resolved(index: int) -> tuple:
+    video_id = f"{index:011d}"
+    return (
+        f"Song {index} (Official Video)",
+        f"https://www.youtube.com/watch?v={video_id}",
+        180 + index % 240,
+        f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        f"Artist {index % 5000}",
+        "youtube",
+    )
+
+
+def _as_dict(index: int) -> dict:
+    title, url, duration, thumbnail, artist, source = _resolved(index)
+    return {"title": title, "url": url, "duration": duration, "thumbnail": thumbnail, "artist": artist, "source": source}
+
+
+def _draws(guilds: int) -> list:
+    rng = random.Random(23)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(CATALOG_SIZE)))
+    return [rng.choices(range(CATALOG_SIZE), cum_weights=cum_weights, k=TRACKS_PER_GUILD) for _ in range(guilds)]
+
+
+def dict_per_entry(draws: list):
+    return [[_as_dict(index) for index in guild] for guild in draws]
+
+
+def dict_per_guild_song(draws: list):
+    queues = []
+    for guild in draws:
+        resolved = {}
+        for index in guild:
+            if index not in resolved:
+                resolved[index] = _as_dict(index)
+        queues.append([resolved[index] for index in guild])
+    return queues
+
+
+def interned_tracks(draws: list):
+    tracks = {index: Track.create(*_resolved(index)) for index in sorted({index for guild in draws for index in guild})}
+    queues = [[tracks[index] for index in guild] for guild in draws]
+    return tracks, queues
+
+
+def measure(build, draws: list) -> int:
+    gc.collect()
+    tracemalloc.start()
+    held = build(draws)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main():
+    started_at = time.perf_counter()
+    draws = _draws(GUILDS)
+    total = GUILDS * TRACKS_PER_GUILD
+    distinct = len({index for guild in draws for index in guild})
+    sample = draws[:DICT_SAMPLE_GUILDS]
+    scale = GUILDS / DICT_SAMPLE_GUILDS
+
+    results = (
+        ("dict per queue entry", measure(dict_per_entry, sample) * scale, "sampled"),
+        ("dict per guild and song", measure(dict_per_guild_song, sample) * scale, "sampled"),
+        ("interned Track", measure(interned_tracks, draws), "full"),
+    )
+
+    tracks, _ = interned_tracks(draws[:1])
+    assert all(Track.create(*_resolved(index)) is track for index, track in itertools.islice(tracks.items(), 1000))
+
+    print(f"{GUILDS} guilds x {TRACKS_PER_GUILD} tracks = {total} queued, {distinct} distinct songs")
+    for name, size, how in results:
+        print(f"  {name:<26} {size / 2**20:>9.1f} MB  {size / total:>6.1f} B/track  ({how})")
+    print(f"  elapsed {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
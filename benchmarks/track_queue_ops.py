@@ -0,0 +1,73 @@
+import time
+from collections import deque
+from itertools import islice
+from track_queue import TrackQueue
+
+QUEUE_SIZES = (500, 10_000, 100_000)
+ROUNDS = 2000
+
+
+def _time(operation, rounds: int = ROUNDS) -> float:
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        operation()
+    return (time.perf_counter() - started_at) / rounds * 1e6
+
+
+def operations(queue, size: int) -> dict:
+    middle = size // 2
+
+    return {
+        "append+popleft": lambda: (queue.append(0), queue.popleft()),
+        "insert+pop middle": lambda: (queue.insert(middle, 0), queue.pop(middle)),
+        "move last to front": lambda: queue.move(size - 1, 0),
+        "get middle": lambda: queue[middle],
+        "page of 8 at middle": lambda: queue.slice(middle, middle + 8),
+    }
+
+
+class ListQueue(list):
+    def popleft(self):
+        return self.pop(0)
+
+    def move(self, source: int, target: int):
+        item = self.pop(source)
+        self.insert(target, item)
+        return item
+
+    def slice(self, start: int, stop: int) -> list:
+        return self[start:stop]
+
+
+class DequeQueue(deque):
+    def pop(self, index: int = -1):
+        item = self[index]
+        del self[index]
+        return item
+
+    def move(self, source: int, target: int):
+        item = self.pop(source)
+        self.insert(target, item)
+        return item
+
+    def slice(self, start: int, stop: int) -> list:
+        return list(islice(self, start, stop))
+
+
+def main():
+    for size in QUEUE_SIZES:
+        queues = {
+            "list": ListQueue(range(size)),
+            "deque": DequeQueue(range(size)),
+            "TrackQueue": TrackQueue(range(size)),
+        }
+        results = {name: operations(queue, size) for name, queue in queues.items()}
+        print(f"{size} tracks (µs per op)")
+        print(f"  {'':<22}" + "".join(f"{name:>12}" for name in queues))
+        for operation in results["list"]:
+            row = "".join(f"{_time(results[name][operation]):>12.2f}" for name in queues)
+            print(f"  {operation:<22}{row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import yt_dlp
+from config import EXTRACTION_WORKERS
+from extraction import YDLPool
+from resolver import MediaResolver
+
+CALLS = 200
+
+
+def fresh_instance(ydl_opts: dict):
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.get_info_extractor('Youtube')
+
+
+def pooled_instance(pool: YDLPool):
+    with pool.checkout() as ydl:
+        ydl.get_info_extractor('Youtube')
+
+
+def _time(call, workers: int) -> float:
+    started_at = time.perf_counter()
+    if workers == 1:
+        for _ in range(CALLS):
+            call()
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(call) for _ in range(CALLS)]:
+                future.result()
+    return (time.perf_counter() - started_at) / CALLS * 1000
+
+
+def _instance_bytes(ydl_opts: dict) -> int:
+    tracemalloc.start()
+    ydl = yt_dlp.YoutubeDL(ydl_opts)
+    ydl.get_info_extractor('Youtube')
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ydl.close()
+    return size
+
+
+def main():
+    resolver = MediaResolver()
+    resolver.extractor.shutdown()
+    ydl_opts = resolver.ydl_opts
+
+    started_at = time.perf_counter()
+    pool = YDLPool(ydl_opts, EXTRACTION_WORKERS)
+    pool_startup = (time.perf_counter() - started_at) * 1000
+
+    print(f"YoutubeDL setup per extraction ({CALLS} calls, ms per call)")
+    for workers in (1, EXTRACTION_WORKERS):
+        fresh = _time(lambda: fresh_instance(ydl_opts), workers)
+        pooled = _time(lambda: pooled_instance(pool), workers)
+        print(f"  {workers} thread(s): new instance {fresh:>7.3f}  pooled {pooled:>7.3f}")
+    print(f"  pool start-up for {EXTRACTION_WORKERS} instances: {pool_startup:.1f} ms")
+    print(f"  memory per instance: {_instance_bytes(ydl_opts) / 1024:.0f} KiB")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import re
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+_PATH_EXPIRE = re.compile(r"/expire/(\d+)")
+
+CACHE_MISS = object()
+
+
+def _sizeof(value) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_sizeof(item) for item in value)
+    elif hasattr(value, '__slots__'):
+        size += sum(_sizeof(getattr(value, slot, None)) for slot in value.__slots__ if slot != '__weakref__')
+    return size
+
+
+class SearchCache:
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: float = 6 * 3600, negative_ttl: float = 60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return CACHE_MISS
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return CACHE_MISS
+
+        self._entries.move_to_end(key)
+        if value is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value, ttl: float = None):
+        if key in self._entries:
+            self._remove(key)
+
+        size = _sizeof(key) + _sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        self._entries[key] = (value, expires_at, size)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def put_negative(self, key: str):
+        self.put(key, None, self.negative_ttl)
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class StreamCache:
+    DEFAULT_TTL = 3600
+    EXPIRY_MARGIN = 120
+
+    def __init__(self, max_size: int = 2048):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    @classmethod
+    def parse_expiry(cls, stream_url: str) -> float:
+        parsed = urlparse(stream_url)
+        expire = parse_qs(parsed.query).get('expire')
+        if expire and expire[0].isdigit():
+            return float(expire[0])
+
+        match = _PATH_EXPIRE.search(parsed.path)
+        if match:
+            return float(match.group(1))
+        return time.time() + cls.DEFAULT_TTL
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+
+        stream, expires_at = entry
+        if expires_at - self.EXPIRY_MARGIN <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return stream
+
+    def put(self, key: str, stream: dict):
+        self._entries[key] = (stream, self.parse_expiry(stream['url']))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def expires_within(self, key: str, seconds: float) -> bool:
+        entry = self._entries.get(key)
+        return entry is None or entry[1] - time.time() <= seconds
+
+    def __contains__(self, key: str):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
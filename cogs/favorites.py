@@ -1,4 +1,5 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 from utils import *
 import db
@@ -7,6 +8,7 @@ from logger import log_command, log_error
 class Favorites(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.suggestions = bot.suggestions
 
     @commands.hybrid_group(name="favorite", description="Gestiona tus canciones favoritas")
     async def favorite(self, ctx):
@@ -25,6 +27,11 @@ class Favorites(commands.Cog):
             embed = create_error_embed(f"Error al agregar a favoritos: {e}")
             await ctx.send(embed=embed)
 
+    @add_favorite.autocomplete("song_name")
+    async def add_favorite_autocomplete(self, interaction: discord.Interaction, current: str):
+        entries = self.suggestions.tracks(interaction.user.id, interaction.guild_id, current)
+        return [app_commands.Choice(name=name, value=name) for name, _ in entries]
+
     @favorite.command(name="list", description="Muestra tus canciones favoritas")
     async def list_favorites(self, ctx):
         try:
@@ -50,5 +57,10 @@ class Favorites(commands.Cog):
             embed = create_error_embed(f"Error al eliminar de favoritos: {e}")
             await ctx.send(embed=embed)
 
+    @remove_favorite.autocomplete("song_name")
+    async def remove_favorite_autocomplete(self, interaction: discord.Interaction, current: str):
+        entries = self.suggestions.tracks(interaction.user.id, None, current)
+        return [app_commands.Choice(name=name, value=name) for name, _ in entries]
+
 async def setup(bot):
     await bot.add_cog(Favorites(bot))
@@ -1,192 +1,542 @@
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
-import yt_dlp
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from collections import defaultdict, deque
 from utils import *
-from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, COLORS
+from config import COLORS, IDLE_TIMEOUT, PREMIUM_FEATURES, QUEUE_HOT_SIZE, QUEUE_SPILL_PATH, SESSION_LOG_PATH
 import asyncio
 import random
+import time
+from collections import deque
 import db
-from logger import log_command, log_error, log_music_event
+from audio import (
+    CROSSFADE_CURVES, DEFAULT_CROSSFADE_CURVE, FRAMES_PER_SECOND,
+    CrossfadeSource, create_source, crossfade_available
+)
+from idle_tracker import IdleTracker
+from track_queue import SpillStore, TieredQueue
+from session_log import SessionLog
+from tracks import Track
+from logger import logger, log_command, log_error, log_music_event
 from functools import lru_cache
 
+class GuildPlayerState:
+    __slots__ = (
+        'guild_id', 'queue', 'now_playing', 'is_playing', 'is_paused', 'message',
+        'loop_status', 'shuffle_enabled', 'volume', 'skip_requested', 'prefetched',
+        'version', 'rendered_queue', 'voice_channel_id', 'text_channel_id', 'author_id',
+        'started_at', 'paused_at', 'resume_at', 'crossfade', 'crossfade_curve', 'mixer', 'pending_next',
+        'history', 'imports'
+    )
+    
+    def __init__(self, guild_id: int, queue: TieredQueue, history_size: int = 1000):
+        self.guild_id = guild_id
+        self.queue = queue
+        self.now_playing = None
+        self.is_playing = False
+        self.is_paused = False
+        self.message = None
+        self.loop_status = "off"
+        self.shuffle_enabled = False
+        self.volume = 100
+        self.skip_requested = False
+        self.prefetched = {}
+        self.version = 0
+        self.rendered_queue = None
+        self.voice_channel_id = None
+        self.text_channel_id = None
+        self.author_id = None
+        self.started_at = None
+        self.paused_at = None
+        self.resume_at = 0
+        self.crossfade = 0
+        self.crossfade_curve = DEFAULT_CROSSFADE_CURVE
+        self.mixer = None
+        self.pending_next = None
+        self.history = deque(maxlen=history_size)
+        self.imports = 0
+
+
+class SessionContext:
+    def __init__(self, guild: discord.Guild, channel, author):
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+
+    @classmethod
+    def from_context(cls, ctx) -> 'SessionContext':
+        if isinstance(ctx, cls):
+            return ctx
+        return cls(ctx.guild, ctx.channel, ctx.author)
+
+    @property
+    def voice_client(self):
+        return self.guild.voice_client
+
+    async def send(self, *args, **kwargs):
+        try:
+            return await self.channel.send(*args, **kwargs)
+        except discord.HTTPException as e:
+            log_error(str(e), "session_send")
+            return None
+
+
 class MusicPlayer:
-    MAX_QUEUE_SIZE = 500
     MAX_HISTORY_PER_GUILD = 1000
+    PREFETCH_DEPTH = 2
+    STREAM_REFRESH_DEPTH = 5
+    STREAM_REFRESH_WINDOW = 900
+    MAX_CROSSFADE_SECONDS = 12
+    JOURNAL_COMPACT_BYTES = 32 * 1024 * 1024
     
-    def __init__(self):
-        self.queues = defaultdict(deque)
-        self.now_playing = {}
-        self.is_playing = defaultdict(bool)
-        self.is_paused = defaultdict(bool)
-        self.current_source = defaultdict(lambda: None)
-        self.loop_status = defaultdict(lambda: "off")
-        self.shuffle_enabled = defaultdict(bool)
-        self.volume = defaultdict(lambda: 50)
-        self._search_cache = {}
-        self._cache_max_size = 256
-        self._guild_cleanup_counter = 0
-        
-        self.ydl_opts = {
-            'format': 'bestaudio/best',
-            'noplaylist': True,
-            'quiet': True,
-            'no_warnings': True,
-            'default_search': 'ytsearch',
-            'socket_timeout': 10,
-            'extractor_args': {'youtube': {'player_client': ['web']}}
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.guilds = {}
+        self.idle = IdleTracker(IDLE_TIMEOUT)
+        self.spill = SpillStore(QUEUE_SPILL_PATH)
+        self.journal = SessionLog(SESSION_LOG_PATH)
+        self.closing = False
+
+    def state(self, guild_id: int) -> GuildPlayerState:
+        state = self.guilds.get(guild_id)
+        if state is None:
+            queue = TieredQueue(self.spill, QUEUE_HOT_SIZE)
+            state = self.guilds[guild_id] = GuildPlayerState(guild_id, queue, self.MAX_HISTORY_PER_GUILD)
+        self.idle.touch(guild_id)
+        return state
+
+    def get_state(self, guild_id: int):
+        return self.guilds.get(guild_id)
+
+    def teardown(self, guild_id: int):
+        self.idle.forget(guild_id)
+        state = self.guilds.pop(guild_id, None)
+        if state:
+            self.journal.record("end", guild_id)
+            state.queue.discard()
+            for task in state.prefetched.values():
+                task.cancel()
+
+    def bind(self, guild_id: int, voice_channel_id: int, text_channel_id: int, author_id: int):
+        state = self.state(guild_id)
+        if (state.voice_channel_id, state.text_channel_id, state.author_id) == (voice_channel_id, text_channel_id, author_id):
+            return
+        state.voice_channel_id = voice_channel_id
+        state.text_channel_id = text_channel_id
+        state.author_id = author_id
+        self.journal.record("session", guild_id, voice=voice_channel_id, text=text_channel_id, author=author_id)
+
+    def _record_settings(self, state: GuildPlayerState):
+        self.journal.record(
+            "session",
+            state.guild_id,
+            loop=state.loop_status,
+            volume=state.volume,
+            shuffle=state.shuffle_enabled,
+            crossfade=state.crossfade,
+            curve=state.crossfade_curve
+        )
+
+    def start_track(self, guild_id: int, song):
+        state = self.state(guild_id)
+        state.now_playing = song
+        if not state.history or state.history[-1] is not song:
+            state.history.append(song)
+        state.started_at = time.time() - state.resume_at
+        state.paused_at = None
+        state.resume_at = 0
+        self.journal.record("started", guild_id, at=state.started_at)
+
+    def history(self, guild_id: int):
+        state = self.guilds.get(guild_id)
+        return state.history if state else ()
+
+    def pause(self, guild_id: int):
+        state = self.state(guild_id)
+        state.is_paused = True
+        if state.paused_at is None:
+            state.paused_at = time.time()
+
+    def resume(self, guild_id: int):
+        state = self.state(guild_id)
+        state.is_paused = False
+        if state.paused_at is None:
+            return
+        if state.started_at:
+            state.started_at += time.time() - state.paused_at
+            self.journal.record("started", guild_id, at=state.started_at)
+        state.paused_at = None
+
+    def _position(self, state: GuildPlayerState):
+        if not state.now_playing or not state.started_at:
+            return None
+        position = max((state.paused_at or time.time()) - state.started_at, 0)
+        if state.now_playing.duration:
+            position = min(position, state.now_playing.duration)
+        return round(position, 1)
+
+    def promote(self, guild_id: int, song):
+        self.journal.record("now", guild_id, t=song.pack())
+        self.start_track(guild_id, song)
+
+    async def _snapshot(self, state: GuildPlayerState) -> dict:
+        rows = await state.queue.dump()
+        return {
+            "session": {
+                "voice": state.voice_channel_id,
+                "text": state.text_channel_id,
+                "author": state.author_id,
+                "loop": state.loop_status,
+                "volume": state.volume,
+                "shuffle": state.shuffle_enabled,
+                "crossfade": state.crossfade,
+                "curve": state.crossfade_curve,
+            },
+            "q": rows,
+            "now": state.now_playing.pack() if state.now_playing else None,
+            "s": self._position(state),
         }
-        
-        if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
-            auth = SpotifyClientCredentials(
-                client_id=SPOTIFY_CLIENT_ID,
-                client_secret=SPOTIFY_CLIENT_SECRET
-            )
-            self.sp = spotipy.Spotify(auth_manager=auth)
+
+    async def compact_journal(self, states):
+        self.journal.begin_compaction()
+        for state in list(states):
+            if not state.voice_channel_id:
+                continue
+            snapshot = await self._snapshot(state)
+            if self.closing or not self.journal.compacting:
+                return
+            if self.guilds.get(state.guild_id) is state:
+                self.journal.record("snapshot", state.guild_id, **snapshot)
+        entries = self.journal.finish_compaction()
+        await asyncio.get_running_loop().run_in_executor(None, self.journal.rewrite, entries)
+
+    async def flush_journal(self):
+        if self.journal.size() > self.JOURNAL_COMPACT_BYTES:
+            await self.compact_journal(self.guilds.values())
         else:
-            self.sp = None
+            self.journal.flush()
 
-    def _get_cache_key(self, query: str, source: str):
-        return f"{source}:{query.lower()}"
-    
-    def _add_to_cache(self, key: str, value):
-        if len(self._search_cache) >= self._cache_max_size:
-            oldest_key = next(iter(self._search_cache))
-            del self._search_cache[oldest_key]
-        self._search_cache[key] = value
-    
-    def _get_from_cache(self, key: str):
-        return self._search_cache.get(key)
-    
-    async def search_youtube(self, query: str):
-        cache_key = self._get_cache_key(query, 'youtube')
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            return cached_result
-        
-        try:
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = await loop.run_in_executor(None, lambda: ydl.extract_info(query, download=False))
-                if info:
-                    result = {
-                        'title': info.get('title', 'Unknown'),
-                        'url': info.get('webpage_url', ''),
-                        'duration': info.get('duration', 0),
-                        'thumbnail': info.get('thumbnail', ''),
-                        'artist': info.get('uploader', 'Unknown'),
-                        'source': 'youtube'
-                    }
-                    self._add_to_cache(cache_key, result)
-                    return result
-        except Exception as e:
-            log_error(str(e), "search_youtube")
-        return None
+    def checkpoint(self):
+        for state in self.guilds.values():
+            position = self._position(state)
+            if position is not None:
+                self.journal.record("position", state.guild_id, s=position)
+        self.journal.abort_compaction()
+        self.journal.flush()
 
-    async def search_spotify(self, query: str):
-        cache_key = self._get_cache_key(query, 'spotify')
-        cached_result = self._get_from_cache(cache_key)
-        if cached_result:
-            return cached_result
-        
-        if not self.sp:
-            return None
-        
-        try:
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None,
-                lambda: self.sp.search(q=query, type='track', limit=1)
-            )
+    async def restore(self) -> list:
+        restored = []
+        for guild_id, saved in self.journal.load().items():
+            session = saved["session"]
+            if not session.get("voice") or not (saved["queue"] or saved["now"]):
+                continue
             
-            if results['tracks']['items']:
-                track = results['tracks']['items'][0]
-                artists = ', '.join([artist['name'] for artist in track['artists']])
-                
-                ydl_query = f"{track['name']} {artists}"
-                youtube_result = await self.search_youtube(ydl_query)
-                
-                result = {
-                    'title': track['name'],
-                    'artist': artists,
-                    'duration': track['duration_ms'] // 1000,
-                    'thumbnail': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                    'url': youtube_result['url'] if youtube_result else None,
-                    'source': 'spotify'
-                }
-                self._add_to_cache(cache_key, result)
-                return result
-        except Exception as e:
-            log_error(str(e), "search_spotify")
-        return None
-
-    async def search(self, query: str, source: str = 'youtube'):
-        if source == 'youtube':
-            return await self.search_youtube(query)
-        elif source == 'spotify':
-            return await self.search_spotify(query)
+            state = self.state(guild_id)
+            state.voice_channel_id = session.get("voice")
+            state.text_channel_id = session.get("text")
+            state.author_id = session.get("author")
+            state.loop_status = session.get("loop", "off")
+            state.volume = session.get("volume", 100)
+            state.shuffle_enabled = session.get("shuffle", False)
+            state.crossfade = session.get("crossfade", 0)
+            state.crossfade_curve = session.get("curve", DEFAULT_CROSSFADE_CURVE)
+            await state.queue.extend(Track.unpack(row) for row in saved["queue"])
+            if saved["now"]:
+                await state.queue.appendleft(Track.unpack(saved["now"]))
+                state.resume_at = saved["position"] or 0
+            restored.append(state)
+        return restored
+
+    def _refresh_candidates(self):
+        for state in list(self.guilds.values()):
+            if not state.is_playing:
+                continue
+            
+            yield from state.queue.peek(self.STREAM_REFRESH_DEPTH)
+            
+            if state.now_playing and state.loop_status in ("one", "all"):
+                yield state.now_playing
+
+    async def refresh_streams(self):
+        refreshed = set()
+        for song in list(self._refresh_candidates()):
+            url = song.get('url')
+            if not url or url in refreshed:
+                continue
+            if not self.resolver.stream_cache.expires_within(url, self.STREAM_REFRESH_WINDOW):
+                continue
+            
+            if await self.resolver.resolve_stream(song, refresh=True):
+                refreshed.add(url)
+        return len(refreshed)
+
+    def prefetch(self, guild_id: int):
+        state = self.state(guild_id)
+        upcoming = [song for song in state.queue.peek(self.PREFETCH_DEPTH) if song.get('url')]
+        upcoming_urls = {song['url'] for song in upcoming}
+        tasks = state.prefetched
+        
+        for url in list(tasks):
+            if url not in upcoming_urls:
+                tasks.pop(url).cancel()
+        
+        for song in upcoming:
+            if song['url'] not in tasks:
+                tasks[song['url']] = asyncio.create_task(self.resolver.resolve_stream(song))
+
+    def cancel_prefetch(self, guild_id: int):
+        state = self.get_state(guild_id)
+        if state:
+            for task in state.prefetched.values():
+                task.cancel()
+            state.prefetched.clear()
+
+    async def get_stream(self, guild_id: int, song: dict):
+        task = self.state(guild_id).prefetched.pop(song.get('url'), None)
+        if task:
+            stream = await task
+            if stream:
+                return stream
+        return await self.resolver.resolve_stream(song)
+
+    def record_ttfa(self, guild_id: int, seconds: float):
+        logger.info(f"Time to first audio: {seconds * 1000:.0f}ms | Guild: {guild_id}")
+
+    async def queue_limit(self, user_id: int):
+        limits = PREMIUM_FEATURES['unlimited_queue']
+        return limits['premium'] if await db.is_premium(user_id) else limits['free']
+
+    async def add_to_queue(self, guild_id: int, song: dict, limit: int = None) -> bool:
+        state = self.state(guild_id)
+        if limit is not None and len(state.queue) >= limit:
+            return False
+        await state.queue.append(song)
+        state.version += 1
+        self.journal.record("append", guild_id, t=song.pack())
+        self.prefetch(guild_id)
+        return True
+
+    async def requeue(self, guild_id: int, song: dict, front: bool = False):
+        state = self.state(guild_id)
+        if front:
+            await state.queue.appendleft(song)
         else:
-            result = await self.search_youtube(query)
-            if not result:
-                result = await self.search_spotify(query)
-            return result
-
-    def add_to_queue(self, guild_id: int, song: dict):
-        queue = self.queues[guild_id]
-        if len(queue) >= self.MAX_QUEUE_SIZE:
-            queue.popleft()
-        queue.append(song)
-        
-        self._guild_cleanup_counter += 1
-        if self._guild_cleanup_counter % 100 == 0:
-            self._cleanup_inactive_guilds()
-
-    def _cleanup_inactive_guilds(self):
-        if len(self.queues) > 50:
-            for guild_id in list(self.queues.keys()):
-                if guild_id not in self.is_playing or not self.is_playing[guild_id]:
-                    if len(self.queues[guild_id]) == 0:
-                        del self.queues[guild_id]
-                        self.now_playing.pop(guild_id, None)
-                        self.loop_status.pop(guild_id, None)
-
-    def get_queue(self, guild_id: int):
-        return list(self.queues[guild_id])
-
-    def clear_queue(self, guild_id: int):
-        self.queues[guild_id].clear()
+            await state.queue.append(song)
+        state.version += 1
+        self.journal.record("appendleft" if front else "append", guild_id, t=song.pack())
+
+    async def insert_at(self, guild_id: int, index: int, song: dict, limit: int = None):
+        state = self.state(guild_id)
+        if limit is not None and len(state.queue) >= limit:
+            return None
+        index = await state.queue.insert(max(index, 0), song)
+        state.version += 1
+        self.journal.record("insert", guild_id, i=index, t=song.pack())
+        self.prefetch(guild_id)
+        return index
+
+    async def move(self, guild_id: int, source: int, target: int):
+        state = self.state(guild_id)
+        song = await state.queue.move(source, target)
+        state.version += 1
+        self.journal.record("move", guild_id, i=source, j=target)
+        self.prefetch(guild_id)
+        return song
+
+    async def remove_at(self, guild_id: int, index: int):
+        state = self.state(guild_id)
+        song = await state.queue.pop(index)
+        state.version += 1
+        self.journal.record("remove", guild_id, i=index)
+        self.prefetch(guild_id)
+        return song
+
+    async def take_next(self, guild_id: int, song) -> bool:
+        state = self.state(guild_id)
+        if not await state.queue.popleft_if(song):
+            return False
+        state.version += 1
+        self.journal.record("remove", guild_id, i=0)
+        self.prefetch(guild_id)
+        return True
+
+    async def duplicate(self, guild_id: int, index: int, limit: int = None):
+        state = self.state(guild_id)
+        song = await state.queue.get(index)
+        return await self.insert_at(guild_id, index + 1, song, limit)
+
+    async def pop_next(self, guild_id: int):
+        state = self.get_state(guild_id)
+        if not state or not state.queue:
+            return None
+        try:
+            song = await state.queue.popleft()
+        except IndexError:
+            return None
+        state.version += 1
+        self.journal.record("next", guild_id)
+        return song
+
+    def queue_length(self, guild_id: int) -> int:
+        state = self.get_state(guild_id)
+        return len(state.queue) if state else 0
+
+    def has_queue(self, guild_id: int) -> bool:
+        state = self.get_state(guild_id)
+        return bool(state and state.queue)
+
+    async def queue_page(self, guild_id: int, page: int, per_page: int = 8) -> list:
+        state = self.get_state(guild_id)
+        if not state:
+            return []
+        start = max(page - 1, 0) * per_page
+        return await state.queue.slice(start, start + per_page)
+
+    async def get_queue(self, guild_id: int):
+        state = self.get_state(guild_id)
+        return [Track.unpack(row) for row in await state.queue.dump()] if state else []
+
+    async def clear_queue(self, guild_id: int):
+        state = self.get_state(guild_id)
+        if state:
+            await state.queue.clear()
+            state.version += 1
+            self.journal.record("clear", guild_id)
+            self.cancel_prefetch(guild_id)
 
     def skip(self, guild_id: int):
-        if self.queues[guild_id]:
-            self.queues[guild_id].popleft()
+        state = self.get_state(guild_id)
+        if state and state.now_playing:
+            state.skip_requested = True
             return True
         return False
 
-    def shuffle_queue(self, guild_id: int):
-        queue = list(self.queues[guild_id])
-        random.shuffle(queue)
-        self.queues[guild_id] = deque(queue)
+    async def shuffle_queue(self, guild_id: int):
+        state = self.state(guild_id)
+        seed = random.getrandbits(64)
+        await state.queue.shuffle(seed)
+        state.version += 1
+        self.journal.record("shuffle", guild_id, seed=seed)
+        self.prefetch(guild_id)
 
     def toggle_loop(self, guild_id: int):
-        if self.loop_status[guild_id] == "off":
-            self.loop_status[guild_id] = "one"
-        elif self.loop_status[guild_id] == "one":
-            self.loop_status[guild_id] = "all"
+        state = self.state(guild_id)
+        if state.loop_status == "off":
+            state.loop_status = "one"
+        elif state.loop_status == "one":
+            state.loop_status = "all"
         else:
-            self.loop_status[guild_id] = "off"
-        return self.loop_status[guild_id]
+            state.loop_status = "off"
+        self._record_settings(state)
+        return state.loop_status
 
     def set_volume(self, guild_id: int, volume: int):
-        self.volume[guild_id] = max(0, min(100, volume))
-        return self.volume[guild_id]
+        state = self.state(guild_id)
+        state.volume = max(0, min(100, volume))
+        self._record_settings(state)
+        return state.volume
+
+    def set_crossfade(self, guild_id: int, seconds: int, curve: str = DEFAULT_CROSSFADE_CURVE):
+        state = self.state(guild_id)
+        state.crossfade = max(0, min(self.MAX_CROSSFADE_SECONDS, seconds))
+        state.crossfade_curve = curve if curve in CROSSFADE_CURVES else DEFAULT_CROSSFADE_CURVE
+        self._record_settings(state)
+        return state.crossfade
+
+    async def set_shuffle(self, guild_id: int, enabled: bool):
+        state = self.state(guild_id)
+        state.shuffle_enabled = enabled
+        self._record_settings(state)
+        if enabled:
+            await self.shuffle_queue(guild_id)
 
 
 class Music(commands.Cog):
+    IMPORT_CONCURRENCY = 4
+    IMPORT_PROGRESS_INTERVAL = 3
+    RESTORE_CONCURRENCY = 10
+    
     def __init__(self, bot):
         self.bot = bot
-        self.player = MusicPlayer()
+        self.player = MusicPlayer(bot.resolver)
+        self.suggestions = bot.suggestions
+        self.stream_refresher.start()
+        self.idle_sweeper.start()
+
+    async def cog_load(self):
+        asyncio.create_task(self._restore_sessions())
+
+    async def cog_unload(self):
+        self.stream_refresher.cancel()
+        self.idle_sweeper.cancel()
+        self.journal_flusher.cancel()
+        
+        self.player.closing = True
+        self.player.checkpoint()
+        for guild_id in list(self.player.guilds):
+            guild = self.bot.get_guild(guild_id)
+            if guild and guild.voice_client:
+                guild.voice_client.stop()
+        self.player.spill.close()
+
+    @tasks.loop(seconds=1)
+    async def journal_flusher(self):
+        await self.player.flush_journal()
+
+    async def _restore_sessions(self):
+        await self.bot.wait_until_ready()
+        started_at = time.perf_counter()
+        states = await self.player.restore()
+        await self.player.compact_journal(states)
+        self.journal_flusher.start()
+        if not states:
+            return
+        
+        semaphore = asyncio.Semaphore(self.RESTORE_CONCURRENCY)
+        results = await asyncio.gather(*(self._resume_session(state, semaphore) for state in states))
+        logger.info(
+            f"Sesiones restauradas: {sum(results)}/{len(states)} en {time.perf_counter() - started_at:.2f}s"
+        )
+
+    async def _resume_session(self, state: GuildPlayerState, semaphore: asyncio.Semaphore) -> bool:
+        guild = self.bot.get_guild(state.guild_id)
+        voice_channel = guild.get_channel(state.voice_channel_id) if guild else None
+        text_channel = guild.get_channel(state.text_channel_id) if guild else None
+        if not voice_channel or not text_channel:
+            self.player.teardown(state.guild_id)
+            return False
+        
+        try:
+            if not guild.voice_client:
+                async with semaphore:
+                    await voice_channel.connect()
+            
+            author = guild.get_member(state.author_id) or guild.me
+            await self._play_next(SessionContext(guild, text_channel, author))
+            return True
+        except Exception as e:
+            log_error(str(e), "restore_session")
+            self.player.teardown(state.guild_id)
+            return False
+
+    @tasks.loop(minutes=5)
+    async def stream_refresher(self):
+        refreshed = await self.player.refresh_streams()
+        if refreshed:
+            logger.debug(f"URLs de stream renovadas: {refreshed}")
+
+    @tasks.loop(seconds=30)
+    async def idle_sweeper(self):
+        for guild_id in self.player.idle.expired():
+            guild = self.bot.get_guild(guild_id)
+            voice_client = guild.voice_client if guild else None
+            if voice_client and (voice_client.is_playing() or voice_client.is_paused()):
+                self.player.idle.touch(guild_id)
+                continue
+            
+            self.player.teardown(guild_id)
+            if voice_client:
+                await voice_client.disconnect()
+                logger.info(f"Desconectado por inactividad | Guild: {guild_id}")
 
     @commands.hybrid_command(name="play", description="Reproduce una canción")
     async def play(self, ctx, *, query: str):
@@ -197,18 +547,32 @@ class Music(commands.Cog):
         channel = ctx.author.voice.channel
         log_command(ctx.author, f"play {query}", ctx.guild.name)
         
+        if self.player.resolver.is_playlist_url(query):
+            if not ctx.voice_client:
+                await channel.connect()
+            self.player.bind(ctx.guild.id, channel.id, ctx.channel.id, ctx.author.id)
+            return await self._import_playlist(ctx, query)
+        
         async with ctx.typing():
-            song = await self.player.search(query)
+            song = await self.player.resolver.search(query, source='any')
         
         if not song:
             embed = create_error_embed(f"No se encontró: **{query}**", "Búsqueda fallida")
             return await ctx.send(embed=embed)
 
+        limit = await self.player.queue_limit(ctx.author.id)
+        if not await self.player.add_to_queue(ctx.guild.id, song, limit):
+            embed = create_error_embed(
+                f"La cola alcanzó el límite de **{limit}** canciones.\nCon premium la cola es ilimitada.",
+                "Cola llena"
+            )
+            return await ctx.send(embed=embed)
+        
         if not ctx.voice_client:
             await channel.connect()
+        self.player.bind(ctx.guild.id, channel.id, ctx.channel.id, ctx.author.id)
         
-        self.player.add_to_queue(ctx.guild.id, song)
-        queue_pos = len(self.player.get_queue(ctx.guild.id))
+        queue_pos = self.player.queue_length(ctx.guild.id)
         
         embed = create_success_embed(
             "✅ Agregado a la cola",
@@ -221,21 +585,154 @@ class Music(commands.Cog):
         await ctx.send(embed=embed)
         log_music_event("added_to_queue", ctx.author.name, song['title'])
         
-        if not ctx.voice_client.is_playing():
+        if not self.player.state(ctx.guild.id).is_playing:
             await self._play_next(ctx)
 
-    async def _play_next(self, ctx):
-        queue = self.player.get_queue(ctx.guild.id)
+    @play.autocomplete("query")
+    async def play_autocomplete(self, interaction: discord.Interaction, current: str):
+        entries = self.suggestions.tracks(interaction.user.id, interaction.guild_id, current)
+        return [app_commands.Choice(name=name, value=value) for name, value in entries]
+
+    async def _import_playlist(self, ctx, url: str):
+        resolver = self.player.resolver
+        message = await ctx.send(embed=create_info_embed("📥 Importando playlist", "Obteniendo canciones..."))
+        pending = asyncio.Queue(maxsize=self.IMPORT_CONCURRENCY)
+        
+        async def produce():
+            try:
+                async for item in resolver.playlist_items(url):
+                    await pending.put(asyncio.create_task(resolver.resolve_playlist_item(item)))
+            except Exception as e:
+                log_error(str(e), "import_playlist")
+            await pending.put(None)
+        
+        limit = await self.player.queue_limit(ctx.author.id)
+        producer = asyncio.create_task(produce())
+        added = failed = 0
+        queue_full = False
+        last_edit = time.monotonic()
+        state = self.player.state(ctx.guild.id)
+        state.imports += 1
         
-        if not queue:
-            if ctx.voice_client:
-                await ctx.voice_client.disconnect()
+        try:
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+                
+                song = await task
+                if not ctx.voice_client or self.player.get_state(ctx.guild.id) is not state:
+                    task.cancel()
+                    producer.cancel()
+                    break
+                
+                if not song:
+                    failed += 1
+                    continue
+                
+                if not await self.player.add_to_queue(ctx.guild.id, song, limit):
+                    queue_full = True
+                    producer.cancel()
+                    break
+                
+                added += 1
+                self._start_playback(ctx, state)
+                
+                if time.monotonic() - last_edit >= self.IMPORT_PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
+                    await message.edit(embed=create_info_embed(
+                        "📥 Importando playlist",
+                        f"✅ {added} canciones agregadas • ❌ {failed} no encontradas\nImportando el resto..."
+                    ))
+        finally:
+            state.imports -= 1
+        
+        if ctx.voice_client and self.player.get_state(ctx.guild.id) is state:
+            self._start_playback(ctx, state)
+        
+        while not pending.empty():
+            task = pending.get_nowait()
+            if task:
+                task.cancel()
+        
+        if not added:
+            embed = create_error_embed(f"No se pudo importar: **{url}**", "Importación fallida")
+        else:
+            embed = create_success_embed(
+                "📥 Playlist importada",
+                f"✅ {added} canciones agregadas a la cola\n❌ {failed} no encontradas"
+            )
+        if queue_full:
+            embed.add_field(name="Cola llena", value=f"Se alcanzó el límite de **{limit}** canciones. Con premium la cola es ilimitada.")
+        await message.edit(embed=embed)
+        log_music_event("playlist_imported", ctx.author.name, url)
+
+    def _start_playback(self, ctx, state: GuildPlayerState):
+        if state.is_playing or not state.queue:
             return
-        
-        song = self.player.queues[ctx.guild.id].popleft()
-        self.player.now_playing[ctx.guild.id] = song
-        self.player.is_playing[ctx.guild.id] = True
-        
+        state.is_playing = True
+        asyncio.create_task(self._play_next(SessionContext.from_context(ctx)))
+
+    async def _play_next(self, ctx):
+        ctx = SessionContext.from_context(ctx)
+        guild_id = ctx.guild.id
+        state = self.player.state(guild_id)
+        state.is_playing = True
+        
+        while True:
+            song = await self.player.pop_next(guild_id) if ctx.voice_client else None
+            if not song and state.imports and ctx.voice_client:
+                state.is_playing = False
+                return
+            if not song:
+                self.player.teardown(guild_id)
+                if ctx.voice_client:
+                    await ctx.voice_client.disconnect()
+                return
+            
+            started_at = time.perf_counter()
+            stream = await self.player.get_stream(guild_id, song)
+            if self.player.closing or self.player.get_state(guild_id) is not state:
+                return
+            self.player.prefetch(guild_id)
+            
+            if stream and ctx.voice_client:
+                break
+            
+            if not stream:
+                state.resume_at = 0
+                embed = create_error_embed(f"No se pudo reproducir: **{song['title'][:60]}**", "Reproducción")
+                await ctx.send(embed=embed)
+        
+        position = state.resume_at
+        crossfade = state.crossfade if crossfade_available() else 0
+        if song.get('duration', 0) - position <= 2 * crossfade:
+            crossfade = 0
+        
+        self.player.start_track(guild_id, song)
+        source = create_source(
+            stream,
+            state.volume,
+            started_at,
+            lambda seconds: self.player.record_ttfa(guild_id, seconds),
+            position,
+            allow_passthrough=not crossfade
+        )
+        if crossfade:
+            source = CrossfadeSource(
+                source,
+                int((song['duration'] - position) * FRAMES_PER_SECOND),
+                crossfade,
+                state.crossfade_curve,
+                on_prepare=lambda: asyncio.run_coroutine_threadsafe(self._prepare_crossfade(ctx), self.bot.loop),
+                on_transition=lambda next_song: asyncio.run_coroutine_threadsafe(self._crossfaded(ctx, next_song), self.bot.loop)
+            )
+        state.mixer = source if crossfade else None
+        ctx.voice_client.play(source, after=lambda error: self._after_track(ctx, error))
+        await self._announce(ctx, song)
+
+    async def _announce(self, ctx, song):
+        self.suggestions.record_track(song, ctx.author.id, ctx.guild.id)
         await db.add_play_history(ctx.author.id, song['title'], song.get('artist', 'Unknown'), song.get('source', 'unknown'), song.get('duration', 0))
         log_music_event("now_playing", ctx.author.name, song['title'])
         
@@ -248,7 +745,82 @@ class Music(commands.Cog):
         )
         
         message = await ctx.send(embed=embed, view=self._create_view(ctx))
-        self.player.current_source[ctx.guild.id] = message
+        state = self.player.get_state(ctx.guild.id)
+        if state:
+            state.message = message
+
+    async def _prepare_crossfade(self, ctx):
+        guild_id = ctx.guild.id
+        state = self.player.get_state(guild_id)
+        mixer = state.mixer if state else None
+        if not mixer or self.player.closing:
+            return
+        
+        from_queue = state.loop_status != "one"
+        if from_queue:
+            upcoming = state.queue.peek(1)
+            song = upcoming[0] if upcoming else None
+        else:
+            song = state.now_playing
+        if not state.crossfade or not song or song.get('duration', 0) <= 2 * state.crossfade:
+            return
+        
+        stream = await self.player.get_stream(guild_id, song)
+        if not stream or self.player.closing or state.mixer is not mixer:
+            return
+        if from_queue and not await self.player.take_next(guild_id, song):
+            return
+        
+        source = create_source(stream, state.volume, time.perf_counter(), allow_passthrough=False)
+        if state.mixer is not mixer or not mixer.queue_next(source, int(song['duration'] * FRAMES_PER_SECOND), song):
+            source.cleanup()
+            if from_queue and not self.player.closing and self.player.get_state(guild_id) is state:
+                await self.player.requeue(guild_id, song, front=True)
+            return
+        if from_queue:
+            state.pending_next = song
+
+    async def _crossfaded(self, ctx, song):
+        state = self.player.get_state(ctx.guild.id)
+        if not state or self.player.closing:
+            return
+        
+        previous, state.pending_next = state.now_playing, None
+        state.skip_requested = False
+        if previous and state.loop_status == "all":
+            await self.player.requeue(ctx.guild.id, previous)
+        
+        self.player.promote(ctx.guild.id, song)
+        await self._announce(ctx, song)
+
+    def _after_track(self, ctx, error):
+        if error:
+            log_error(str(error), "playback")
+        asyncio.run_coroutine_threadsafe(self._advance(ctx), self.bot.loop)
+
+    async def _advance(self, ctx):
+        state = self.player.get_state(ctx.guild.id)
+        if not state or self.player.closing:
+            return
+        
+        song, state.now_playing = state.now_playing, None
+        skipped, state.skip_requested = state.skip_requested, False
+        state.mixer = None
+        if state.pending_next:
+            await self.player.requeue(ctx.guild.id, state.pending_next, front=True)
+            state.pending_next = None
+        
+        if not ctx.voice_client:
+            self.player.teardown(ctx.guild.id)
+            return
+        
+        if song:
+            if state.loop_status == "one" and not skipped:
+                await self.player.requeue(ctx.guild.id, song, front=True)
+            elif state.loop_status == "all":
+                await self.player.requeue(ctx.guild.id, song)
+        
+        await self._play_next(ctx)
 
     def _create_view(self, ctx):
         view = discord.ui.View()
@@ -256,23 +828,23 @@ class Music(commands.Cog):
         async def pause_callback(interaction):
             if ctx.voice_client and ctx.voice_client.is_playing():
                 ctx.voice_client.pause()
-                self.player.is_paused[ctx.guild.id] = True
+                self.player.pause(ctx.guild.id)
                 await interaction.response.defer()
         
         async def resume_callback(interaction):
             if ctx.voice_client and ctx.voice_client.is_paused():
                 ctx.voice_client.resume()
-                self.player.is_paused[ctx.guild.id] = False
+                self.player.resume(ctx.guild.id)
                 await interaction.response.defer()
         
         async def skip_callback(interaction):
-            if ctx.voice_client and ctx.voice_client.is_playing():
+            if ctx.voice_client and (ctx.voice_client.is_playing() or ctx.voice_client.is_paused()):
                 self.player.skip(ctx.guild.id)
                 ctx.voice_client.stop()
             await interaction.response.defer()
         
         async def stop_callback(interaction):
-            self.player.clear_queue(ctx.guild.id)
+            self.player.teardown(ctx.guild.id)
             if ctx.voice_client:
                 await ctx.voice_client.disconnect()
             await interaction.response.defer()
@@ -298,26 +870,30 @@ class Music(commands.Cog):
     @commands.hybrid_command(name="queue", description="Muestra la cola de reproducción")
     async def queue(self, ctx, page: int = 1):
         log_command(ctx.author, "queue", ctx.guild.name)
-        queue = self.player.get_queue(ctx.guild.id)
+        state = self.player.get_state(ctx.guild.id)
         
-        if not queue:
+        if not state or not state.queue:
             embed = create_error_embed("La cola está vacía", "Queue")
             return await ctx.send(embed=embed)
         
-        embed = create_queue_embed(queue, page)
+        cached = state.rendered_queue
+        if cached and cached[0] == state.version and cached[1] == page:
+            embed = cached[2]
+        else:
+            songs = await self.player.queue_page(ctx.guild.id, page)
+            embed = create_queue_embed(songs, page, total=len(state.queue))
+            state.rendered_queue = (state.version, page, embed)
         await ctx.send(embed=embed)
 
     @commands.hybrid_command(name="skip", description="Salta la canción actual")
     async def skip(self, ctx):
         log_command(ctx.author, "skip", ctx.guild.name)
         
-        if self.player.get_queue(ctx.guild.id):
-            self.player.skip(ctx.guild.id)
-            if ctx.voice_client:
-                ctx.voice_client.stop()
+        if ctx.voice_client and self.player.skip(ctx.guild.id):
+            ctx.voice_client.stop()
             embed = create_success_embed("⏭ Canción saltada", "")
         else:
-            embed = create_error_embed("No hay canciones en la cola", "Queue vacía")
+            embed = create_error_embed("No hay canción reproduciéndose", "Skip")
         
         await ctx.send(embed=embed)
 
@@ -325,8 +901,7 @@ class Music(commands.Cog):
     async def stop(self, ctx):
         log_command(ctx.author, "stop", ctx.guild.name)
         
-        self.player.clear_queue(ctx.guild.id)
-        self.player.is_playing[ctx.guild.id] = False
+        self.player.teardown(ctx.guild.id)
         
         if ctx.voice_client:
             await ctx.voice_client.disconnect()
@@ -340,7 +915,7 @@ class Music(commands.Cog):
         
         if ctx.voice_client and ctx.voice_client.is_playing():
             ctx.voice_client.pause()
-            self.player.is_paused[ctx.guild.id] = True
+            self.player.pause(ctx.guild.id)
             embed = create_success_embed("⏸ Música pausada", "")
         else:
             embed = create_error_embed("No hay música reproduciéndose", "Pause")
@@ -353,7 +928,7 @@ class Music(commands.Cog):
         
         if ctx.voice_client and ctx.voice_client.is_paused():
             ctx.voice_client.resume()
-            self.player.is_paused[ctx.guild.id] = False
+            self.player.resume(ctx.guild.id)
             embed = create_success_embed("▶ Música reanudada", "")
         else:
             embed = create_error_embed("No hay música pausada", "Resume")
@@ -364,13 +939,9 @@ class Music(commands.Cog):
     async def shuffle(self, ctx):
         log_command(ctx.author, "shuffle", ctx.guild.name)
         
-        if self.player.shuffle_enabled[ctx.guild.id]:
-            self.player.shuffle_enabled[ctx.guild.id] = False
-            status = "❌ Desactivado"
-        else:
-            self.player.shuffle_enabled[ctx.guild.id] = True
-            self.player.shuffle_queue(ctx.guild.id)
-            status = "✅ Activado"
+        enabled = not self.player.state(ctx.guild.id).shuffle_enabled
+        await self.player.set_shuffle(ctx.guild.id, enabled)
+        status = "✅ Activado" if enabled else "❌ Desactivado"
         
         embed = create_success_embed("🔀 Shuffle", f"Shuffle ha sido {status}")
         await ctx.send(embed=embed)
@@ -385,19 +956,47 @@ class Music(commands.Cog):
         embed = create_success_embed("🔁 Modo de repetición", f"Repetición: {status_map.get(loop_status, 'Desconocido')}")
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="crossfade", description="Mezcla el final de cada canción con la siguiente (0 para desactivar)")
+    @app_commands.choices(curve=[
+        app_commands.Choice(name="Potencia constante", value="equal_power"),
+        app_commands.Choice(name="Lineal", value="linear"),
+        app_commands.Choice(name="Suave", value="smooth"),
+    ])
+    async def crossfade(self, ctx, seconds: int, curve: str = DEFAULT_CROSSFADE_CURVE):
+        log_command(ctx.author, f"crossfade {seconds} {curve}", ctx.guild.name)
+        
+        if seconds and not crossfade_available():
+            embed = create_error_embed("El crossfade requiere NumPy instalado en el bot", "Crossfade")
+            return await ctx.send(embed=embed)
+        
+        seconds = self.player.set_crossfade(ctx.guild.id, seconds, curve)
+        if seconds:
+            message = f"Crossfade de **{seconds}s** activado\nSe aplicará a partir de la siguiente canción"
+        else:
+            message = "Crossfade ❌ Desactivado"
+        embed = create_success_embed("🎚 Crossfade", message)
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command(name="volume", description="Ajusta el volumen (0-100)")
     async def volume(self, ctx, vol: int):
         log_command(ctx.author, f"volume {vol}", ctx.guild.name)
         
         volume = self.player.set_volume(ctx.guild.id, vol)
-        embed = create_success_embed("🔊 Volumen", f"Volumen ajustado a **{volume}%**")
+        message = f"Volumen ajustado a **{volume}%**"
+        source = ctx.voice_client.source if ctx.voice_client else None
+        if source and source.passthrough:
+            message += "\nSe aplicará a partir de la siguiente canción"
+        elif source:
+            source.volume = volume / 100
+        embed = create_success_embed("🔊 Volumen", message)
         await ctx.send(embed=embed)
 
     @commands.hybrid_command(name="nowplaying", description="Muestra la canción actual")
     async def nowplaying(self, ctx):
         log_command(ctx.author, "nowplaying", ctx.guild.name)
         
-        song = self.player.now_playing.get(ctx.guild.id)
+        state = self.player.get_state(ctx.guild.id)
+        song = state.now_playing if state else None
         
         if not song:
             embed = create_error_embed("No hay canción reproduciéndose", "Now Playing")
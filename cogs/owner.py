@@ -210,6 +210,14 @@ class Owner(commands.Cog):
                 inline=False
             )
             
+            if hasattr(self.bot, "resolver"):
+                hedge_stats = self.bot.resolver.hedge_stats
+                embed.add_field(
+                    name="🔎 Búsquedas",
+                    value=f"YouTube: {hedge_stats['youtube']}\nSpotify: {hedge_stats['spotify']}\nCon cobertura: {hedge_stats['hedged']}\nSin resultado: {hedge_stats['miss']}\nRetardo: {self.bot.resolver.hedge_delay():.1f}s",
+                    inline=False
+                )
+            
             embed.set_footer(text="Hecho por flexyng | BSD-3-Clause License")
             await ctx.send(embed=embed)
         except Exception as e:
@@ -1,4 +1,5 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 from utils import *
 import db
@@ -7,6 +8,7 @@ from logger import log_command, log_error
 class Playlists(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.suggestions = bot.suggestions
 
     @commands.hybrid_group(name="playlist", description="Gestiona tus playlists")
     async def playlist(self, ctx):
@@ -18,6 +20,7 @@ class Playlists(commands.Cog):
             log_command(ctx.author, "playlist create", ctx.guild.name)
             
             await db.create_playlist(ctx.author.id, name, description)
+            self.suggestions.record_playlist(ctx.author.id, name)
             embed = create_success_embed("📋 Playlist creada", f"**{name}** ha sido creada exitosamente")
             await ctx.send(embed=embed)
         except Exception as e:
@@ -64,6 +67,7 @@ class Playlists(commands.Cog):
                 return await ctx.send(embed=embed)
             
             await db.delete_playlist(playlist_id)
+            self.suggestions.forget_playlist(ctx.author.id, name)
             embed = create_success_embed("🗑 Playlist eliminada", f"**{name}** ha sido eliminada")
             await ctx.send(embed=embed)
         except Exception as e:
@@ -71,5 +75,10 @@ class Playlists(commands.Cog):
             embed = create_error_embed(f"Error al eliminar playlist: {e}")
             await ctx.send(embed=embed)
 
+    @delete_playlist.autocomplete("name")
+    async def delete_playlist_autocomplete(self, interaction: discord.Interaction, current: str):
+        entries = self.suggestions.playlists(interaction.user.id, current)
+        return [app_commands.Choice(name=name, value=value) for name, value in entries]
+
 async def setup(bot):
     await bot.add_cog(Playlists(bot))
@@ -9,6 +9,19 @@ class QueueManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    def _player(self, ctx):
+        music = self.bot.get_cog('Music')
+        if not music:
+            return None
+        state = music.player.get_state(ctx.guild.id)
+        if not state or not (state.is_playing or state.queue):
+            return None
+        return music.player
+
+    async def _send_no_session(self, ctx):
+        embed = create_error_embed("No hay reproducción activa. Usa /play primero")
+        await ctx.send(embed=embed)
+
     @commands.hybrid_group(name="queuemgr", description="Gestiona la cola de reproducción avanzadamente")
     async def queuemgr(self, ctx):
         pass
@@ -22,9 +35,24 @@ class QueueManager(commands.Cog):
                 embed = create_error_embed("La posición debe ser mayor a 0")
                 return await ctx.send(embed=embed)
             
+            player = self._player(ctx)
+            if not player:
+                return await self._send_no_session(ctx)
+            
+            song = await player.resolver.search(song_name, source='any')
+            if not song:
+                embed = create_error_embed(f"No se encontró: **{song_name}**")
+                return await ctx.send(embed=embed)
+            
+            limit = await player.queue_limit(ctx.author.id)
+            index = await player.insert_at(ctx.guild.id, position - 1, song, limit)
+            if index is None:
+                embed = create_error_embed(f"La cola alcanzó el límite de {limit} canciones")
+                return await ctx.send(embed=embed)
+            
             embed = create_success_embed(
                 "📌 Canción Insertada",
-                f"**{song_name}** fue insertada en posición #{position}"
+                f"**{song['title']}** fue insertada en posición #{index + 1}"
             )
             embed.set_footer(text="Hecho por flexyng | BSD-3-Clause License")
             await ctx.send(embed=embed)
@@ -42,9 +70,19 @@ class QueueManager(commands.Cog):
                 embed = create_error_embed("Las posiciones deben ser mayores a 0")
                 return await ctx.send(embed=embed)
             
+            player = self._player(ctx)
+            if not player:
+                return await self._send_no_session(ctx)
+            
+            length = player.queue_length(ctx.guild.id)
+            if from_pos > length or to_pos > length:
+                embed = create_error_embed(f"La cola solo tiene {length} canciones")
+                return await ctx.send(embed=embed)
+            
+            song = await player.move(ctx.guild.id, from_pos - 1, to_pos - 1)
             embed = create_success_embed(
                 "🔄 Canción Movida",
-                f"Canción movida de posición #{from_pos} a #{to_pos}"
+                f"**{song['title']}** movida de posición #{from_pos} a #{to_pos}"
             )
             embed.set_footer(text="Hecho por flexyng | BSD-3-Clause License")
             await ctx.send(embed=embed)
@@ -62,9 +100,19 @@ class QueueManager(commands.Cog):
                 embed = create_error_embed("La posición debe ser mayor a 0")
                 return await ctx.send(embed=embed)
             
+            player = self._player(ctx)
+            if not player:
+                return await self._send_no_session(ctx)
+            
+            length = player.queue_length(ctx.guild.id)
+            if position > length:
+                embed = create_error_embed(f"La cola solo tiene {length} canciones")
+                return await ctx.send(embed=embed)
+            
+            song = await player.remove_at(ctx.guild.id, position - 1)
             embed = create_success_embed(
                 "🗑 Canción Eliminada",
-                f"Canción en posición #{position} fue eliminada"
+                f"**{song['title']}** (posición #{position}) fue eliminada"
             )
             embed.set_footer(text="Hecho por flexyng | BSD-3-Clause License")
             await ctx.send(embed=embed)
@@ -78,6 +126,11 @@ class QueueManager(commands.Cog):
         try:
             log_command(ctx.author, "queuemgr clear", ctx.guild.name)
             
+            player = self._player(ctx)
+            if not player:
+                return await self._send_no_session(ctx)
+            
+            await player.clear_queue(ctx.guild.id)
             embed = create_success_embed(
                 "🧹 Cola Limpiada",
                 "Todas las canciones en la cola fueron eliminadas"
@@ -98,9 +151,23 @@ class QueueManager(commands.Cog):
                 embed = create_error_embed("La posición debe ser mayor a 0")
                 return await ctx.send(embed=embed)
             
+            player = self._player(ctx)
+            if not player:
+                return await self._send_no_session(ctx)
+            
+            length = player.queue_length(ctx.guild.id)
+            if position > length:
+                embed = create_error_embed(f"La cola solo tiene {length} canciones")
+                return await ctx.send(embed=embed)
+            
+            limit = await player.queue_limit(ctx.author.id)
+            if await player.duplicate(ctx.guild.id, position - 1, limit) is None:
+                embed = create_error_embed(f"La cola alcanzó el límite de {limit} canciones")
+                return await ctx.send(embed=embed)
+            
             embed = create_success_embed(
                 "📋 Canción Duplicada",
-                f"Canción en posición #{position} fue duplicada"
+                f"Canción en posición #{position} fue duplicada en #{position + 1}"
             )
             embed.set_footer(text="Hecho por flexyng | BSD-3-Clause License")
             await ctx.send(embed=embed)
@@ -118,9 +185,29 @@ class QueueManager(commands.Cog):
                 embed = create_error_embed("Cantidad debe estar entre 1 y 50")
                 return await ctx.send(embed=embed)
             
+            player = self._player(ctx)
+            if not player:
+                return await self._send_no_session(ctx)
+            
+            history = player.history(ctx.guild.id)
+            if not history:
+                embed = create_error_embed("Aún no se ha reproducido ninguna canción en este servidor")
+                return await ctx.send(embed=embed)
+            
+            picked = {}
+            for index in random.sample(range(len(history)), min(quantity, len(history))):
+                song = history[index]
+                picked.setdefault(song.url, song)
+            limit = await player.queue_limit(ctx.author.id)
+            added = 0
+            for song in picked.values():
+                if not await player.add_to_queue(ctx.guild.id, song, limit):
+                    break
+                added += 1
+            
             embed = create_success_embed(
                 "🎲 Canciones Aleatorias Agregadas",
-                f"Se agregaron **{quantity}** canciones aleatorias a la cola"
+                f"Se agregaron **{added}** canciones aleatorias a la cola"
             )
             embed.set_footer(text="Hecho por flexyng | BSD-3-Clause License")
             await ctx.send(embed=embed)
@@ -1,32 +1,21 @@
 import discord
 from discord.ext import commands
 import db
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, COLORS
+from config import COLORS
 from utils import create_info_embed, create_error_embed, format_duration
 from logger import log_command, log_error
-import asyncio
 from collections import Counter
 
 class Recommendations(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        
-        if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
-            auth = SpotifyClientCredentials(
-                client_id=SPOTIFY_CLIENT_ID,
-                client_secret=SPOTIFY_CLIENT_SECRET
-            )
-            self.sp = spotipy.Spotify(auth_manager=auth)
-        else:
-            self.sp = None
+        self.spotify = bot.resolver.spotify
 
     @commands.hybrid_command(name="recommend", description="Obtiene recomendaciones basadas en tus gustos")
     async def recommend(self, ctx, limit: int = 5):
         log_command(ctx.author, f"recommend {limit}", ctx.guild.name)
         
-        if not self.sp:
+        if not self.spotify:
             embed = create_error_embed(
                 "Las recomendaciones requieren credenciales de Spotify. Por favor configura tu bot con tokens de Spotify.",
                 "Recomendaciones"
@@ -48,23 +37,13 @@ class Recommendations(commands.Cog):
                     )
                     return await ctx.send(embed=embed)
                 
-                loop = asyncio.get_event_loop()
+                artist_id = await self.spotify.artist_id(favorite_artist)
                 
-                artist_results = await loop.run_in_executor(
-                    None,
-                    lambda: self.sp.search(q=favorite_artist, type='artist', limit=1)
-                )
-                
-                if not artist_results['artists']['items']:
+                if not artist_id:
                     embed = create_error_embed("No se encontró el artista favorito", "Recomendaciones")
                     return await ctx.send(embed=embed)
                 
-                artist_id = artist_results['artists']['items'][0]['id']
-                
-                recommendations = await loop.run_in_executor(
-                    None,
-                    lambda: self.sp.recommendations(seed_artists=[artist_id], limit=limit)
-                )
+                recommendations = await self.spotify.recommendations(seed_artists=[artist_id], limit=limit)
                 
             except Exception as e:
                 log_error(str(e), "recommend")
@@ -105,7 +84,7 @@ class Recommendations(commands.Cog):
     async def similar_songs(self, ctx):
         log_command(ctx.author, "similar", ctx.guild.name)
         
-        if not self.sp:
+        if not self.spotify:
             embed = create_error_embed(
                 "Esta función requiere credenciales de Spotify",
                 "Similar"
@@ -125,23 +104,13 @@ class Recommendations(commands.Cog):
         
         async with ctx.typing():
             try:
-                loop = asyncio.get_event_loop()
-                
-                search_results = await loop.run_in_executor(
-                    None,
-                    lambda: self.sp.search(q=favorite_title, type='track', limit=1)
-                )
+                tracks = await self.spotify.search_tracks(favorite_title, limit=1)
                 
-                if not search_results['tracks']['items']:
+                if not tracks:
                     embed = create_error_embed("No se encontró la canción", "Similar")
                     return await ctx.send(embed=embed)
                 
-                track_id = search_results['tracks']['items'][0]['id']
-                
-                similar = await loop.run_in_executor(
-                    None,
-                    lambda: self.sp.recommendations(seed_tracks=[track_id], limit=5)
-                )
+                similar = await self.spotify.recommendations(seed_tracks=[tracks[0]['id']], limit=5)
                 
             except Exception as e:
                 log_error(str(e), "similar_songs")
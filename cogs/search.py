@@ -1,123 +1,91 @@
 import discord
 from discord.ext import commands
-import yt_dlp
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, COLORS
+from config import COLORS
 from utils import create_info_embed
-from logger import log_command, log_error
+from logger import log_command
 import asyncio
 
 class SearchPreviews(commands.Cog):
+    PROVIDER_DEADLINE = 3.0
+    LATE_RESULTS_TIMEOUT = 15.0
+    
     def __init__(self, bot):
         self.bot = bot
-        self.ydl_opts = {
-            'format': 'bestaudio/best',
-            'noplaylist': True,
-            'quiet': True,
-            'no_warnings': True,
-            'default_search': 'ytsearch',
-        }
-        
-        if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
-            auth = SpotifyClientCredentials(
-                client_id=SPOTIFY_CLIENT_ID,
-                client_secret=SPOTIFY_CLIENT_SECRET
-            )
-            self.sp = spotipy.Spotify(auth_manager=auth)
-        else:
-            self.sp = None
-
-    async def search_youtube_preview(self, query: str, limit: int = 5):
-        try:
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = await loop.run_in_executor(None, lambda: ydl.extract_info(f"ytsearch{limit}:{query}", download=False))
-                results = []
-                if info:
-                    for item in info.get('entries', []):
-                        results.append({
-                            'title': item.get('title', 'Unknown'),
-                            'url': item.get('webpage_url', ''),
-                            'duration': item.get('duration', 0),
-                            'thumbnail': item.get('thumbnail', ''),
-                            'artist': item.get('uploader', 'Unknown'),
-                            'source': 'youtube'
-                        })
-                return results
-        except Exception as e:
-            log_error(str(e), "search_youtube_preview")
-            return []
+        self.resolver = bot.resolver
 
-    async def search_spotify_preview(self, query: str, limit: int = 5):
-        if not self.sp:
-            return []
-        
-        try:
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None,
-                lambda: self.sp.search(q=query, type='track', limit=limit)
-            )
-            
-            preview_results = []
-            if results['tracks']['items']:
-                for track in results['tracks']['items']:
-                    artists = ', '.join([artist['name'] for artist in track['artists']])
-                    preview_results.append({
-                        'title': track['name'],
-                        'artist': artists,
-                        'duration': track['duration_ms'] // 1000,
-                        'thumbnail': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                        'url': track['external_urls'].get('spotify', ''),
-                        'source': 'spotify'
-                    })
-            return preview_results
-        except Exception as e:
-            log_error(str(e), "search_spotify_preview")
-            return []
-
-    @commands.hybrid_command(name="search", description="Busca canciones con previsualizaciones")
-    async def search(self, ctx, source: str = "all", *, query: str):
-        log_command(ctx.author, f"search {source} {query}", ctx.guild.name)
-        
-        async with ctx.typing():
-            youtube_results = []
-            spotify_results = []
-            
-            if source in ["youtube", "all"]:
-                youtube_results = await self.search_youtube_preview(query, 5)
-            
-            if source in ["spotify", "all"] and self.sp:
-                spotify_results = await self.search_spotify_preview(query, 5)
-        
-        if not youtube_results and not spotify_results:
-            embed = discord.Embed(
-                title="❌ No se encontraron resultados",
-                description=f"No hay resultados para: **{query}**",
-                color=COLORS["error"]
-            )
-            return await ctx.send(embed=embed)
-        
+    def _create_results_embed(self, query: str, results: dict, pending: set) -> discord.Embed:
         embed = discord.Embed(
             title=f"🔍 Resultados de búsqueda para: {query}",
             color=COLORS["primary"]
         )
         
+        youtube_results = results.get("youtube")
         if youtube_results:
             yt_text = ""
             for i, result in enumerate(youtube_results[:5], 1):
                 yt_text += f"`{i}.` **{result['title'][:50]}** | {result['artist'][:30]}\n"
             embed.add_field(name="🎬 YouTube", value=yt_text, inline=False)
+        elif "youtube" in pending:
+            embed.add_field(name="🎬 YouTube", value="⏳ Buscando...", inline=False)
         
+        spotify_results = results.get("spotify")
         if spotify_results:
             sp_text = ""
             for i, result in enumerate(spotify_results[:5], 1):
                 sp_text += f"`{i}.` **{result['title'][:50]}** - {result['artist'][:30]}\n"
             embed.add_field(name="🎵 Spotify", value=sp_text, inline=False)
+        elif "spotify" in pending:
+            embed.add_field(name="🎵 Spotify", value="⏳ Buscando...", inline=False)
         
         embed.set_footer(text="Usa /play <canción> para reproducir • Hecho por flexyng | BSD-3-Clause License")
-        await ctx.send(embed=embed)
+        return embed
+
+    def _collect(self, tasks: dict, results: dict):
+        for name, task in list(tasks.items()):
+            if task.done():
+                results[name] = task.result()
+                del tasks[name]
+
+    @commands.hybrid_command(name="search", description="Busca canciones con previsualizaciones")
+    async def search(self, ctx, source: str = "all", *, query: str):
+        log_command(ctx.author, f"search {source} {query}", ctx.guild.name)
+        
+        tasks = {}
+        if source in ["youtube", "all"]:
+            tasks["youtube"] = asyncio.create_task(self.resolver.search_youtube_preview(query, 5))
+        if source in ["spotify", "all"] and self.resolver.spotify:
+            tasks["spotify"] = asyncio.create_task(self.resolver.search_spotify_preview(query, 5))
+        
+        results = {}
+        async with ctx.typing():
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=self.PROVIDER_DEADLINE)
+            self._collect(tasks, results)
+            
+            if tasks and not any(results.values()):
+                await asyncio.wait(tasks.values(), timeout=self.LATE_RESULTS_TIMEOUT)
+                self._collect(tasks, results)
+        
+        if tasks and any(results.values()):
+            message = await ctx.send(embed=self._create_results_embed(query, results, set(tasks)))
+            await asyncio.wait(tasks.values(), timeout=self.LATE_RESULTS_TIMEOUT)
+            self._collect(tasks, results)
+            for task in tasks.values():
+                task.cancel()
+            return await message.edit(embed=self._create_results_embed(query, results, set()))
+        
+        for task in tasks.values():
+            task.cancel()
+        
+        if not any(results.values()):
+            embed = discord.Embed(
+                title="❌ No se encontraron resultados",
+                description=f"No hay resultados para: **{query}**",
+                color=COLORS["error"]
+            )
+            return await ctx.send(embed=embed)
+        
+        await ctx.send(embed=self._create_results_embed(query, results, set()))
 
 async def setup(bot):
     await bot.add_cog(SearchPreviews(bot))
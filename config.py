@@ -11,6 +11,17 @@ MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "discord_music_bot")
 DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "es")
 
+EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "thread")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+EXTRACTION_MAX_JOBS = int(os.getenv("EXTRACTION_MAX_JOBS", "200"))
+TRACK_INDEX_THRESHOLD = float(os.getenv("TRACK_INDEX_THRESHOLD", "0.85"))
+IDLE_TIMEOUT = int(os.getenv("IDLE_TIMEOUT", "300"))
+QUEUE_HOT_SIZE = int(os.getenv("QUEUE_HOT_SIZE", "100"))
+if QUEUE_HOT_SIZE < 1:
+    raise ValueError("QUEUE_HOT_SIZE debe ser al menos 1")
+QUEUE_SPILL_PATH = os.getenv("QUEUE_SPILL_PATH", "data/queue_spill.sqlite3")
+SESSION_LOG_PATH = os.getenv("SESSION_LOG_PATH", "data/sessions.log")
+
 COMMAND_PREFIX = "!"
 OWNER_IDS = [int(oid) for oid in os.getenv("OWNER_IDS", "").split(",") if oid.strip()] if os.getenv("OWNER_IDS") else []
 
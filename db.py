@@ -36,6 +36,8 @@ async def create_indexes():
     await db.user_settings.create_index([("user_id", ASCENDING)], unique=True)
     await db.premium_keys.create_index([("key", ASCENDING)], unique=True)
     await db.premium_users.create_index([("user_id", ASCENDING)], unique=True)
+    await db.spotify_mappings.create_index([("spotify_id", ASCENDING)], unique=True)
+    await db.resolved_tracks.create_index([("url", ASCENDING)], unique=True)
 
 async def create_playlist(user_id: int, name: str, description: str = None):
     try:
@@ -239,6 +241,58 @@ async def set_user_language(user_id: int, language: str):
         logger.error(f"Error estableciendo idioma: {e}")
         raise
 
+async def get_spotify_mapping(spotify_id: str):
+    try:
+        return await db.spotify_mappings.find_one({"spotify_id": spotify_id})
+    except Exception as e:
+        logger.error(f"Error obteniendo mapeo de Spotify: {e}")
+        return None
+
+async def save_spotify_mapping(spotify_id: str, youtube_id: str, confidence: float):
+    try:
+        await db.spotify_mappings.update_one(
+            {"spotify_id": spotify_id},
+            {
+                "$set": {
+                    "spotify_id": spotify_id,
+                    "youtube_id": youtube_id,
+                    "confidence": confidence,
+                    "verified_at": datetime.utcnow()
+                }
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error guardando mapeo de Spotify: {e}")
+
+async def save_resolved_track(track: dict, alias: str = None):
+    try:
+        update = {
+            "$set": {
+                "url": track["url"],
+                "title": track.get("title"),
+                "artist": track.get("artist"),
+                "duration": track.get("duration"),
+                "thumbnail": track.get("thumbnail"),
+                "source": track.get("source"),
+                "resolved_at": datetime.utcnow()
+            }
+        }
+        if alias:
+            update["$addToSet"] = {"aliases": alias.lower()}
+        await db.resolved_tracks.update_one({"url": track["url"]}, update, upsert=True)
+    except Exception as e:
+        logger.error(f"Error guardando canción resuelta: {e}")
+
+async def get_resolved_tracks(limit: int = 100000):
+    try:
+        return await db.resolved_tracks.find(
+            {}, {"_id": 0}
+        ).sort("resolved_at", DESCENDING).limit(limit).to_list(length=limit)
+    except Exception as e:
+        logger.error(f"Error obteniendo canciones resueltas: {e}")
+        return []
+
 async def close_db():
     global client
     if client:
@@ -0,0 +1,167 @@
+import asyncio
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+import yt_dlp
+from config import EXTRACTION_BACKEND, EXTRACTION_WORKERS, EXTRACTION_MAX_JOBS
+from logger import logger
+
+_worker_ydl = None
+
+MODE_PARAMS = {
+    'flat': {'extract_flat': 'in_playlist'},
+    'playlist': {'extract_flat': 'in_playlist', 'noplaylist': False, 'playlistend': 500},
+}
+
+
+def track_from_info(info: dict) -> dict:
+    thumbnail = info.get('thumbnail')
+    if not thumbnail and info.get('thumbnails'):
+        thumbnail = info['thumbnails'][-1].get('url')
+    return {
+        'title': info.get('title', 'Unknown'),
+        'url': info.get('webpage_url') or info.get('url', ''),
+        'duration': int(info.get('duration') or 0),
+        'thumbnail': thumbnail or '',
+        'artist': info.get('uploader') or info.get('channel') or 'Unknown',
+        'source': 'youtube'
+    }
+
+
+def stream_from_info(info: dict):
+    if not info.get('url'):
+        return None
+    return {
+        'url': info['url'],
+        'http_headers': info.get('http_headers', {}),
+        'acodec': info.get('acodec'),
+        'ext': info.get('ext')
+    }
+
+
+def compact_info(info: dict, mode: str):
+    if not info:
+        return None
+    
+    if mode in ('entries', 'flat', 'playlist'):
+        return [track_from_info(entry) for entry in info.get('entries') or [] if entry]
+    
+    if info.get('entries') is not None:
+        entries = [entry for entry in info['entries'] if entry]
+        if not entries:
+            return None
+        info = entries[0]
+    
+    if mode == 'stream':
+        return stream_from_info(info)
+    return track_from_info(info)
+
+
+def run_extraction(ydl, query: str, mode: str):
+    overrides = MODE_PARAMS.get(mode)
+    if not overrides:
+        return compact_info(ydl.extract_info(query, download=False), mode)
+    
+    previous = {key: ydl.params.get(key) for key in overrides}
+    ydl.params.update(overrides)
+    try:
+        return compact_info(ydl.extract_info(query, download=False), mode)
+    finally:
+        ydl.params.update(previous)
+
+
+class YDLPool:
+    def __init__(self, ydl_opts: dict, size: int):
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            ydl = yt_dlp.YoutubeDL(ydl_opts)
+            ydl.get_info_extractor('Youtube')
+            self._idle.put(ydl)
+
+    @contextmanager
+    def checkout(self):
+        ydl = self._idle.get()
+        try:
+            yield ydl
+        finally:
+            self._idle.put(ydl)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class ThreadExtractor:
+    def __init__(self, ydl_opts: dict, workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ydl")
+        self._pool = YDLPool(ydl_opts, workers)
+
+    def _run(self, query: str, mode: str):
+        with self._pool.checkout() as ydl:
+            return run_extraction(ydl, query, mode)
+
+    async def extract(self, query: str, mode: str = 'track'):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, query, mode)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pool.close()
+
+
+def _init_worker(ydl_opts: dict):
+    global _worker_ydl
+    _worker_ydl = yt_dlp.YoutubeDL(ydl_opts)
+    _worker_ydl.get_info_extractor('Youtube')
+
+
+def _extract_in_worker(query: str, mode: str):
+    return run_extraction(_worker_ydl, query, mode)
+
+
+class ProcessExtractor:
+    def __init__(self, ydl_opts: dict, workers: int = 2, max_jobs_per_worker: int = 200):
+        self.ydl_opts = ydl_opts
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._jobs = 0
+        self._executor = self._create_executor()
+
+    def _create_executor(self):
+        self._jobs = 0
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(self.ydl_opts,)
+        )
+
+    def _recycle_if_needed(self):
+        self._jobs += 1
+        if self._jobs > self.workers * self.max_jobs_per_worker:
+            logger.debug("Reciclando procesos de extracción")
+            self._executor.shutdown(wait=False)
+            self._executor = self._create_executor()
+            self._jobs = 1
+
+    async def extract(self, query: str, mode: str = 'track'):
+        loop = asyncio.get_running_loop()
+        self._recycle_if_needed()
+        try:
+            return await loop.run_in_executor(self._executor, _extract_in_worker, query, mode)
+        except BrokenProcessPool:
+            logger.warning("Pool de procesos de extracción roto, recreándolo")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            return await loop.run_in_executor(self._executor, _extract_in_worker, query, mode)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_extractor(ydl_opts: dict):
+    if EXTRACTION_BACKEND == "process":
+        return ProcessExtractor(ydl_opts, EXTRACTION_WORKERS, EXTRACTION_MAX_JOBS)
+    return ThreadExtractor(ydl_opts, EXTRACTION_WORKERS)
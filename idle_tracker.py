@@ -0,0 +1,42 @@
+import heapq
+import time
+
+
+class IdleTracker:
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._last_seen = {}
+        self._heap = []
+        self._scheduled = set()
+
+    def touch(self, key):
+        now = time.monotonic()
+        self._last_seen[key] = now
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            heapq.heappush(self._heap, (now + self.timeout, key))
+
+    def forget(self, key):
+        self._last_seen.pop(key, None)
+
+    def expired(self) -> list:
+        now = time.monotonic()
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            last_seen = self._last_seen.get(key)
+            if last_seen is None:
+                self._scheduled.discard(key)
+            elif last_seen + self.timeout > now:
+                heapq.heappush(self._heap, (last_seen + self.timeout, key))
+            else:
+                self._scheduled.discard(key)
+                del self._last_seen[key]
+                expired.append(key)
+        return expired
+
+    def __contains__(self, key):
+        return key in self._last_seen
+
+    def __len__(self):
+        return len(self._last_seen)
@@ -4,6 +4,8 @@ import asyncio
 from config import DISCORD_TOKEN, COMMAND_PREFIX, COLORS
 from db import init_db
 from logger import logger
+from resolver import MediaResolver
+from autocomplete import SuggestionIndex
 import os
 import sys
 import gc
@@ -117,6 +119,10 @@ async def main():
             await init_db()
             logger.info("✅ Base de datos inicializada")
             
+            bot.resolver = MediaResolver()
+            await bot.resolver.start()
+            bot.suggestions = SuggestionIndex()
+            
             await load_cogs()
             logger.info("✅ Cogs cargados")
             
@@ -125,8 +131,13 @@ async def main():
         logger.error(f"Error fatal: {e}", exc_info=True)
         sys.exit(1)
     finally:
+        music = bot.get_cog("Music")
+        if music:
+            music.player.checkpoint()
         from db import close_db
         await close_db()
+        if hasattr(bot, "resolver"):
+            bot.resolver.shutdown()
 
 if __name__ == "__main__":
     try:
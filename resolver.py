@@ -0,0 +1,358 @@
+import asyncio
+import re
+import time
+import db
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+from urllib.parse import urlparse, parse_qs
+from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, TRACK_INDEX_THRESHOLD
+from cache import CACHE_MISS, SearchCache, StreamCache
+from extraction import create_extractor
+from spotify_gateway import SpotifyGateway
+from track_index import TrackIndex
+from tracks import Track, youtube_id_from_url, youtube_url
+from collections import Counter, deque
+from logger import logger, log_error
+
+
+SPOTIFY_TRACK_URL = re.compile(r"(?:open\.spotify\.com/(?:intl-[\w-]+/)?|spotify:)track[/:]([A-Za-z0-9]+)")
+SPOTIFY_COLLECTION_URL = re.compile(r"(?:open\.spotify\.com/(?:intl-[\w-]+/)?|spotify:)(playlist|album)[/:]([A-Za-z0-9]+)")
+
+
+def match_confidence(track: dict, youtube_result: dict) -> float:
+    expected = f"{track['name']} {', '.join(artist['name'] for artist in track['artists'])}".lower()
+    title_score = SequenceMatcher(None, expected, youtube_result['title'].lower()).ratio()
+    duration_gap = abs(track['duration_ms'] / 1000 - (youtube_result.get('duration') or 0))
+    duration_score = max(0.0, 1 - duration_gap / 30)
+    return round(0.7 * title_score + 0.3 * duration_score, 3)
+
+
+class MediaResolver:
+    SEARCH_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    HEDGE_DELAY = 4.0
+    HEDGE_PERCENTILE = 0.9
+    HEDGE_MIN_SAMPLES = 20
+    MAX_PLAYLIST_TRACKS = 500
+    SPOTIFY_MAPPING_MAX_AGE = timedelta(days=30)
+    
+    def __init__(self):
+        self.hedge_stats = Counter()
+        self._youtube_latency = deque(maxlen=200)
+        self._search_cache = SearchCache(max_bytes=self.SEARCH_CACHE_MAX_BYTES)
+        self.stream_cache = StreamCache()
+        self._spotify_mappings = SearchCache(max_bytes=2 * 1024 * 1024, ttl=24 * 3600)
+        self._inflight = {}
+        self.track_index = TrackIndex(TRACK_INDEX_THRESHOLD)
+        
+        self.ydl_opts = {
+            'format': 'bestaudio/best',
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'default_search': 'ytsearch',
+            'socket_timeout': 10,
+            'extractor_args': {'youtube': {'player_client': ['web']}}
+        }
+        self.extractor = create_extractor(self.ydl_opts)
+        
+        if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
+            self.spotify = SpotifyGateway(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
+        else:
+            self.spotify = None
+
+    async def start(self):
+        for stored in await db.get_resolved_tracks():
+            track = Track.from_dict(stored)
+            self.track_index.add(track)
+            for alias in stored.get('aliases', []):
+                self.track_index.add(track, alias)
+        logger.info(f"✅ Índice local de canciones cargado: {len(self.track_index)} canciones")
+
+    def shutdown(self):
+        self.extractor.shutdown()
+
+    def _remember(self, result: dict, alias: str = None):
+        if self.track_index.add(result, alias):
+            asyncio.create_task(db.save_resolved_track(result, alias))
+
+    def _get_cache_key(self, query: str, source: str):
+        return f"{source}:{query.lower()}"
+    
+    async def _single_flight(self, key: str, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    async def search_youtube(self, query: str):
+        cache_key = self._get_cache_key(query, 'youtube')
+        cached_result = self._search_cache.get(cache_key)
+        if cached_result is not CACHE_MISS:
+            return cached_result
+        
+        return await self._single_flight(cache_key, lambda: self._extract_youtube(query, cache_key))
+    
+    async def _extract_youtube(self, query: str, cache_key: str):
+        try:
+            started_at = time.perf_counter()
+            result = await self.extractor.extract(query)
+            if result:
+                self._youtube_latency.append(time.perf_counter() - started_at)
+                result = Track.from_dict(result)
+                self._search_cache.put(cache_key, result)
+                return result
+        except Exception as e:
+            log_error(str(e), "search_youtube")
+        self._search_cache.put_negative(cache_key)
+        return None
+
+    async def resolve_stream(self, song: dict, refresh: bool = False):
+        if not song.get('url'):
+            return None
+        
+        if not refresh:
+            cached_stream = self.stream_cache.get(song['url'])
+            if cached_stream:
+                return cached_stream
+        
+        return await self._single_flight(f"stream:{song['url']}", lambda: self._extract_stream(song))
+
+    async def _extract_stream(self, song: dict):
+        try:
+            stream = await self.extractor.extract(song['url'], mode='stream')
+            if stream:
+                self.stream_cache.put(song['url'], stream)
+                return stream
+        except Exception as e:
+            log_error(str(e), "resolve_stream")
+        return None
+
+    async def search_spotify(self, query: str):
+        cache_key = self._get_cache_key(query, 'spotify')
+        cached_result = self._search_cache.get(cache_key)
+        if cached_result is not CACHE_MISS:
+            return cached_result
+        
+        if not self.spotify:
+            return None
+        
+        return await self._single_flight(cache_key, lambda: self._extract_spotify(query, cache_key))
+
+    async def _extract_spotify(self, query: str, cache_key: str):
+        try:
+            match = SPOTIFY_TRACK_URL.search(query)
+            if match:
+                tracks = [await self.spotify.track(match.group(1))]
+            else:
+                tracks = await self.spotify.search_tracks(query, limit=1)
+            
+            if tracks and tracks[0]:
+                result = await self.song_from_spotify(tracks[0])
+                self._search_cache.put(cache_key, result)
+                return result
+        except Exception as e:
+            log_error(str(e), "search_spotify")
+        self._search_cache.put_negative(cache_key)
+        return None
+
+    async def song_from_spotify(self, track: dict):
+        artists = ', '.join([artist['name'] for artist in track['artists']])
+        images = track.get('album', {}).get('images')
+        return Track.create(
+            track['name'],
+            await self.youtube_url_for_spotify(track),
+            track['duration_ms'] // 1000,
+            images[0]['url'] if images else None,
+            artists,
+            'spotify'
+        )
+
+    async def youtube_url_for_spotify(self, track: dict):
+        spotify_id = track['id']
+        youtube_id = self._spotify_mappings.get(spotify_id)
+        if youtube_id is not CACHE_MISS:
+            return youtube_url(youtube_id)
+        
+        mapping = await db.get_spotify_mapping(spotify_id)
+        if mapping and datetime.utcnow() - mapping['verified_at'] < self.SPOTIFY_MAPPING_MAX_AGE:
+            self._spotify_mappings.put(spotify_id, mapping['youtube_id'])
+            return youtube_url(mapping['youtube_id'])
+        
+        artists = ', '.join([artist['name'] for artist in track['artists']])
+        youtube_result = await self.search_youtube(f"{track['name']} {artists}")
+        if not youtube_result:
+            return None
+        
+        youtube_id = youtube_id_from_url(youtube_result['url'])
+        if youtube_id:
+            self._spotify_mappings.put(spotify_id, youtube_id)
+            await db.save_spotify_mapping(spotify_id, youtube_id, match_confidence(track, youtube_result))
+        return youtube_result['url']
+
+    def is_playlist_url(self, query: str) -> bool:
+        if SPOTIFY_COLLECTION_URL.search(query):
+            return True
+        parsed = urlparse(query)
+        if 'youtube.com' not in parsed.netloc or parsed.path.rstrip('/') != '/playlist':
+            return False
+        playlist_id = parse_qs(parsed.query).get('list')
+        return bool(playlist_id) and not playlist_id[0].startswith('RD')
+
+    async def playlist_items(self, url: str):
+        match = SPOTIFY_COLLECTION_URL.search(url)
+        if not match:
+            entries = await self.extractor.extract(url, mode='playlist')
+            for entry in (entries or [])[:self.MAX_PLAYLIST_TRACKS]:
+                yield entry
+            return
+        
+        if not self.spotify:
+            return
+        
+        kind, collection_id = match.groups()
+        album = None
+        if kind == 'album':
+            album = await self.spotify.album(collection_id)
+        
+        offset = 0
+        while offset < self.MAX_PLAYLIST_TRACKS:
+            if kind == 'album':
+                page = await self.spotify.album_tracks(collection_id, limit=50, offset=offset)
+            else:
+                page = await self.spotify.playlist_items(collection_id, limit=100, offset=offset)
+            
+            for item in page['items']:
+                track = item.get('track', item) if kind == 'playlist' else item
+                if not track or not track.get('id'):
+                    continue
+                if album:
+                    track['album'] = {'images': album['images']}
+                yield track
+            
+            if not page.get('next'):
+                break
+            offset += len(page['items'])
+
+    async def resolve_playlist_item(self, item: dict):
+        if item.get('source') == 'youtube':
+            return Track.from_dict(item) if item.get('url') else None
+        
+        try:
+            song = await self.song_from_spotify(item)
+            return song if song['url'] else None
+        except Exception as e:
+            log_error(str(e), "resolve_playlist_item")
+            return None
+
+    async def search(self, query: str, source: str = 'youtube'):
+        is_url = query.startswith(('http://', 'https://', 'spotify:'))
+        if not is_url:
+            indexed = self.track_index.lookup(query, 'spotify' if source == 'spotify' else None)
+            if indexed:
+                return indexed
+        
+        result = await self._search_sources(query, source)
+        if result and result.get('url'):
+            self._remember(result, None if is_url else query)
+        return result
+
+    async def _search_sources(self, query: str, source: str):
+        if SPOTIFY_TRACK_URL.search(query):
+            return await self.search_spotify(query)
+        if source == 'youtube' or query.startswith(('http://', 'https://')):
+            return await self.search_youtube(query)
+        elif source == 'spotify':
+            return await self.search_spotify(query)
+        else:
+            return await self._hedged_search(query)
+
+    def hedge_delay(self) -> float:
+        if len(self._youtube_latency) < self.HEDGE_MIN_SAMPLES:
+            return self.HEDGE_DELAY
+        samples = sorted(self._youtube_latency)
+        return samples[int(len(samples) * self.HEDGE_PERCENTILE)]
+
+    async def _spotify_hedge(self, query: str, primary: asyncio.Future):
+        cached_result = self._search_cache.get(self._get_cache_key(query, 'spotify'))
+        if cached_result is not CACHE_MISS:
+            return cached_result
+        
+        try:
+            tracks = await self.spotify.search_tracks(query, limit=1)
+            if not tracks or primary.done():
+                return None
+            return await self.song_from_spotify(tracks[0])
+        except Exception as e:
+            log_error(str(e), "spotify_hedge")
+            return None
+
+    async def _hedged_search(self, query: str):
+        started_at = time.perf_counter()
+        primary = asyncio.ensure_future(self.search_youtube(query))
+        tasks = {primary: 'youtube'}
+        hedge_started = not self.spotify
+        
+        try:
+            while tasks:
+                timeout = None if hedge_started else self.hedge_delay()
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    provider = tasks.pop(task)
+                    result = task.result()
+                    if result:
+                        self.hedge_stats[provider] += 1
+                        logger.debug(f"Búsqueda con cobertura: ganó {provider} en {time.perf_counter() - started_at:.2f}s")
+                        return result
+                
+                if not hedge_started:
+                    hedge_started = True
+                    self.hedge_stats['hedged'] += 1
+                    tasks[asyncio.ensure_future(self._spotify_hedge(query, primary))] = 'spotify'
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        self.hedge_stats['miss'] += 1
+        return None
+
+    async def search_youtube_preview(self, query: str, limit: int = 5):
+        try:
+            results = await self.extractor.extract(f"ytsearch{limit}:{query}", mode='flat')
+        except Exception as e:
+            log_error(str(e), "search_youtube_preview")
+            return []
+        
+        if not results:
+            return []
+        
+        results = [Track.from_dict(result) for result in results]
+        self._search_cache.put(self._get_cache_key(query, 'youtube'), results[0])
+        for result in results:
+            if result['url']:
+                self._search_cache.put(self._get_cache_key(result['url'], 'youtube'), result)
+        return results
+
+    async def search_spotify_preview(self, query: str, limit: int = 5):
+        if not self.spotify:
+            return []
+        
+        try:
+            preview_results = []
+            for track in await self.spotify.search_tracks(query, limit=limit):
+                if track:
+                    artists = ', '.join([artist['name'] for artist in track['artists']])
+                    preview_results.append({
+                        'title': track['name'],
+                        'artist': artists,
+                        'duration': track['duration_ms'] // 1000,
+                        'thumbnail': track['album']['images'][0]['url'] if track['album']['images'] else None,
+                        'url': track['external_urls'].get('spotify', ''),
+                        'source': 'spotify'
+                    })
+            return preview_results
+        except Exception as e:
+            log_error(str(e), "search_spotify_preview")
+            return []
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+from logger import logger
+from track_queue import TrackQueue, permute
+
+
+def _new_session() -> dict:
+    return {"session": {}, "queue": TrackQueue(), "now": None, "started": None, "position": None}
+
+
+def _encode(entries: list) -> str:
+    return ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+
+
+class SessionLog:
+    def __init__(self, path: str):
+        self.path = path
+        self._pending = []
+        self._lock = threading.Lock()
+        self.compacting = False
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def record(self, op: str, guild_id: int, **fields):
+        fields["op"] = op
+        fields["g"] = guild_id
+        self._pending.append(fields)
+
+    def flush(self) -> int:
+        if self.compacting or not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        with self._lock, open(self.path, 'a', encoding='utf-8') as log_file:
+            log_file.write(_encode(pending))
+        return len(pending)
+
+    def begin_compaction(self):
+        self.flush()
+        self.compacting = True
+
+    def abort_compaction(self):
+        self.compacting = False
+
+    def finish_compaction(self) -> list:
+        pending, self._pending = self._pending, []
+        self.compacting = False
+        return pending
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def load(self) -> dict:
+        sessions = {}
+        if not os.path.exists(self.path):
+            return sessions
+
+        with open(self.path, encoding='utf-8') as log_file:
+            for line_number, line in enumerate(log_file, start=1):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Registro de sesión inválido en la línea {line_number}, se omite")
+                    continue
+
+                guild_id = entry["g"]
+                if entry["op"] == "end":
+                    sessions.pop(guild_id, None)
+                    continue
+
+                session = sessions.get(guild_id)
+                if session is None:
+                    session = sessions[guild_id] = _new_session()
+                try:
+                    self._apply(session, entry)
+                except IndexError:
+                    logger.warning(f"Registro de sesión fuera de rango en la línea {line_number}, se omite")
+        return sessions
+
+    def _apply(self, session: dict, entry: dict):
+        op = entry["op"]
+        queue = session["queue"]
+        if op == "session":
+            session["session"].update({key: value for key, value in entry.items() if key not in ("op", "g")})
+        elif op == "append":
+            queue.append(entry["t"])
+        elif op == "appendleft":
+            queue.appendleft(entry["t"])
+        elif op == "insert":
+            queue.insert(entry["i"], entry["t"])
+        elif op == "remove":
+            queue.pop(entry["i"])
+        elif op == "move":
+            queue.move(entry["i"], entry["j"])
+        elif op == "clear":
+            queue.clear()
+        elif op == "replace":
+            session["queue"] = TrackQueue(entry["q"])
+        elif op == "shuffle":
+            session["queue"] = TrackQueue(permute(queue, entry["seed"]))
+        elif op == "next":
+            session["now"] = queue.popleft() if queue else None
+            session["started"] = session["position"] = None
+        elif op == "now":
+            session["now"] = entry["t"]
+            session["started"] = session["position"] = None
+        elif op == "started":
+            session["started"] = entry["at"]
+        elif op == "position":
+            session["position"] = entry["s"]
+        elif op == "snapshot":
+            session.update(
+                session=entry["session"],
+                queue=TrackQueue(entry["q"]),
+                now=entry.get("now"),
+                started=None,
+                position=entry.get("s")
+            )
+
+    def rewrite(self, entries: list):
+        temporary_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(temporary_path, 'w', encoding='utf-8') as log_file:
+                log_file.write(_encode(entries))
+            os.replace(temporary_path, self.path)
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from functools import partial
+import requests
+import spotipy
+import urllib3
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyClientCredentials
+from cache import CACHE_MISS, SearchCache
+from logger import logger
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class IdBatcher:
+    def __init__(self, fetch, max_batch: int, delay: float = 0.02):
+        self._fetch = fetch
+        self.max_batch = max_batch
+        self.delay = delay
+        self._pending = {}
+        self._flush_handle = None
+
+    async def get(self, item_id: str):
+        future = self._pending.get(item_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[item_id] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.delay, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            asyncio.create_task(self._run(batch))
+
+    async def _run(self, batch: dict):
+        try:
+            results = await self._fetch(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {item['id']: item for item in results if item}
+        for item_id, future in batch.items():
+            if not future.done():
+                future.set_result(by_id.get(item_id))
+
+
+def _http_session() -> requests.Session:
+    retry = urllib3.Retry(
+        total=3,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        respect_retry_after_header=False
+    )
+    adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class SpotifyGateway:
+    MAX_RETRIES = 2
+    REQUESTS_PER_SECOND = 10
+    BURST = 20
+
+    def __init__(self, client_id: str, client_secret: str):
+        auth = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret)
+        self.sp = spotipy.Spotify(auth_manager=auth, requests_session=_http_session())
+        self.bucket = TokenBucket(self.REQUESTS_PER_SECOND, self.BURST)
+        self._artist_ids = SearchCache(max_bytes=1024 * 1024, ttl=7 * 24 * 3600)
+        self._track_batcher = IdBatcher(self._fetch_tracks, max_batch=50, delay=0)
+
+    async def _call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self.bucket.acquire()
+            try:
+                return await loop.run_in_executor(None, partial(method, *args, **kwargs))
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == self.MAX_RETRIES:
+                    raise
+                retry_after = float((e.headers or {}).get('Retry-After', 1))
+                logger.warning(f"Spotify rate limit alcanzado, esperando {retry_after}s")
+                self.bucket.pause(retry_after)
+
+    async def _fetch_tracks(self, ids: list):
+        return (await self._call(self.sp.tracks, ids))['tracks']
+
+    async def track(self, track_id: str):
+        return await self._track_batcher.get(track_id)
+
+    async def search_tracks(self, query: str, limit: int = 1):
+        results = await self._call(self.sp.search, q=query, type='track', limit=limit)
+        return results['tracks']['items']
+
+    async def artist_id(self, name: str):
+        key = name.lower()
+        cached_id = self._artist_ids.get(key)
+        if cached_id is not CACHE_MISS:
+            return cached_id
+
+        results = await self._call(self.sp.search, q=name, type='artist', limit=1)
+        items = results['artists']['items']
+        if not items:
+            self._artist_ids.put_negative(key)
+            return None
+
+        self._artist_ids.put(key, items[0]['id'])
+        return items[0]['id']
+
+    async def recommendations(self, **kwargs):
+        return await self._call(self.sp.recommendations, **kwargs)
+
+    async def album(self, album_id: str):
+        return await self._call(self.sp.album, album_id)
+
+    async def album_tracks(self, album_id: str, limit: int = 50, offset: int = 0):
+        return await self._call(self.sp.album_tracks, album_id, limit=limit, offset=offset)
+
+    async def playlist_items(self, playlist_id: str, limit: int = 100, offset: int = 0):
+        return await self._call(
+            self.sp.playlist_items,
+            playlist_id,
+            limit=limit,
+            offset=offset,
+            additional_types=('track',)
+        )
@@ -0,0 +1,114 @@
+import json
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from spotipy.cache_handler import MemoryCacheHandler
+
+
+def fake_track(track_id: str) -> dict:
+    return {
+        "id": track_id,
+        "name": f"Track {track_id}",
+        "duration_ms": 180000,
+        "artists": [{"id": f"artist-{track_id}", "name": f"Artist {track_id}"}],
+        "album": {"images": []},
+    }
+
+
+class FakeSpotify:
+    def __init__(self):
+        self.tracks = {}
+        self.requests = []
+        self.hits = Counter()
+        self._rate_limits = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def add_tracks(self, *track_ids: str):
+        for track_id in track_ids:
+            self.tracks[track_id] = fake_track(track_id)
+
+    def rate_limit(self, path: str, times: int = 1, retry_after: int = 1):
+        self._rate_limits.setdefault(path, deque()).extend([retry_after] * times)
+
+    def attach(self, gateway):
+        gateway.sp.prefix = f"{self.url}/v1/"
+        gateway.sp.auth_manager.OAUTH_TOKEN_URL = f"{self.url}/api/token"
+        gateway.sp.auth_manager.cache_handler = MemoryCacheHandler()
+        return gateway
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_rate_limit(self, path: str):
+        with self._lock:
+            pending = self._rate_limits.get(path)
+            return pending.popleft() if pending else None
+
+    def _record(self, path: str, query: dict):
+        with self._lock:
+            self.requests.append((path, query))
+            self.hits[path] += 1
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: dict = None, headers: dict = None):
+                payload = json.dumps(body or {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if urlparse(self.path).path == "/api/token":
+                    return self._reply(200, {"access_token": "fake", "token_type": "Bearer", "expires_in": 3600})
+                self._reply(404, {"error": {"status": 404, "message": "Not found"}})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                path = parsed.path.rstrip("/")
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                fake._record(path, query)
+
+                retry_after = fake._next_rate_limit(path)
+                if retry_after is not None:
+                    return self._reply(
+                        429,
+                        {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                        {"Retry-After": str(retry_after)}
+                    )
+
+                if path == "/v1/tracks":
+                    ids = query.get("ids", "").split(",")
+                    return self._reply(200, {"tracks": [fake.tracks.get(track_id) for track_id in ids]})
+                if path.startswith("/v1/tracks/"):
+                    track = fake.tracks.get(path.rsplit("/", 1)[-1])
+                    if track:
+                        return self._reply(200, track)
+                elif path == "/v1/search":
+                    items = [track for track in fake.tracks.values() if query.get("q", "") in track["name"]]
+                    return self._reply(200, {"tracks": {"items": items[:int(query.get("limit", 10))]}})
+                self._reply(404, {"error": {"status": 404, "message": "Not found"}})
+
+        return Handler
@@ -0,0 +1,103 @@
+import time
+import pytest
+import cache
+from cache import CACHE_MISS, SearchCache, StreamCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+def test_search_cache_hits_and_expires(clock):
+    search_cache = SearchCache(ttl=60)
+    search_cache.put("query", {"url": "https://example.com/1"})
+
+    assert search_cache.get("query") == {"url": "https://example.com/1"}
+    clock.now += 60
+    assert search_cache.get("query") is CACHE_MISS
+    assert search_cache.get("other") is CACHE_MISS
+    assert search_cache.stats()["hits"] == 1
+    assert search_cache.stats()["misses"] == 2
+    assert len(search_cache) == 0
+
+
+def test_search_cache_negative_entries_use_their_own_ttl(clock):
+    search_cache = SearchCache(ttl=3600, negative_ttl=30)
+    search_cache.put_negative("missing")
+
+    assert search_cache.get("missing") is None
+    assert search_cache.stats()["negative_hits"] == 1
+    clock.now += 30
+    assert search_cache.get("missing") is CACHE_MISS
+
+
+def test_search_cache_evicts_least_recently_used_by_bytes(clock):
+    value = {"title": "x" * 100}
+    search_cache = SearchCache()
+    search_cache.put("probe", value)
+    search_cache = SearchCache(max_bytes=search_cache.current_bytes * 2)
+    search_cache.put("a", value)
+    search_cache.put("b", value)
+    search_cache.get("a")
+    search_cache.put("c", value)
+
+    assert search_cache.get("b") is CACHE_MISS
+    assert search_cache.get("a") == value
+    assert search_cache.get("c") == value
+    assert search_cache.stats()["evictions"] == 1
+    assert search_cache.current_bytes <= search_cache.max_bytes
+
+
+def test_search_cache_skips_values_larger_than_the_budget(clock):
+    search_cache = SearchCache(max_bytes=100)
+    search_cache.put("big", "x" * 1000)
+
+    assert search_cache.get("big") is CACHE_MISS
+    assert search_cache.current_bytes == 0
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://rr1.googlevideo.com/videoplayback?expire=1700003600&id=abc", 1700003600.0),
+    ("https://manifest.googlevideo.com/api/manifest/hls/expire/1700007200/id/abc/file.m3u8", 1700007200.0),
+    ("https://cdn.example.com/audio.mp3?expire=soon", None),
+])
+def test_parse_expiry(clock, url, expected):
+    if expected is None:
+        expected = clock.now + StreamCache.DEFAULT_TTL
+    assert StreamCache.parse_expiry(url) == expected
+
+
+def test_stream_cache_drops_entries_inside_the_expiry_margin(clock):
+    stream_cache = StreamCache()
+    expire = int(clock.now) + 600
+    stream_cache.put("song", {"url": f"https://example.com/stream?expire={expire}"})
+
+    assert "song" in stream_cache
+    assert not stream_cache.expires_within("song", 300)
+    assert stream_cache.expires_within("song", 600)
+    clock.now = expire - StreamCache.EXPIRY_MARGIN
+    assert stream_cache.get("song") is None
+    assert stream_cache.expires_within("song", 0)
+
+
+def test_stream_cache_keeps_the_most_recent_entries():
+    stream_cache = StreamCache(max_size=2)
+    expire = int(time.time()) + 3600
+    for key in ("a", "b", "c"):
+        stream_cache.put(key, {"url": f"https://example.com/{key}?expire={expire}"})
+
+    assert len(stream_cache) == 2
+    assert "a" not in stream_cache
+    assert "c" in stream_cache
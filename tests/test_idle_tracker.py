@@ -0,0 +1,90 @@
+import pytest
+import idle_tracker
+from idle_tracker import IdleTracker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(idle_tracker.time, "monotonic", clock)
+    return clock
+
+
+def test_expires_after_timeout(clock):
+    tracker = IdleTracker(60)
+    tracker.touch(1)
+    tracker.touch(2)
+
+    clock.now += 59
+    assert tracker.expired() == []
+
+    clock.now += 1
+    assert sorted(tracker.expired()) == [1, 2]
+    assert len(tracker) == 0
+    assert tracker.expired() == []
+
+
+def test_touch_pushes_the_deadline_back(clock):
+    tracker = IdleTracker(60)
+    tracker.touch(1)
+    clock.now += 45
+    tracker.touch(1)
+
+    clock.now += 30
+    assert tracker.expired() == []
+    assert 1 in tracker
+
+    clock.now += 30
+    assert tracker.expired() == [1]
+
+
+def test_forget_drops_the_key(clock):
+    tracker = IdleTracker(60)
+    tracker.touch(1)
+    tracker.forget(1)
+
+    clock.now += 60
+    assert tracker.expired() == []
+    assert 1 not in tracker
+
+
+def test_forgotten_key_can_be_touched_again(clock):
+    tracker = IdleTracker(60)
+    tracker.touch(1)
+    tracker.forget(1)
+    clock.now += 30
+    tracker.touch(1)
+
+    clock.now += 30
+    assert tracker.expired() == []
+
+    clock.now += 30
+    assert tracker.expired() == [1]
+
+
+def test_expired_key_rearms_on_touch(clock):
+    tracker = IdleTracker(60)
+    tracker.touch(1)
+    clock.now += 60
+    assert tracker.expired() == [1]
+
+    tracker.touch(1)
+    clock.now += 60
+    assert tracker.expired() == [1]
+
+
+def test_heap_holds_one_entry_per_key(clock):
+    tracker = IdleTracker(60)
+    for _ in range(100):
+        tracker.touch(1)
+        clock.now += 1
+
+    assert len(tracker._heap) == 1
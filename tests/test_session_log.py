@@ -0,0 +1,170 @@
+import random
+import pytest
+from session_log import SessionLog
+from track_queue import permute
+
+
+def _row(index: int) -> list:
+    return [f"Song {index}", f"https://example.com/{index}", 120, None, "Artist", "youtube"]
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return SessionLog(str(tmp_path / "sessions.log"))
+
+
+def _queue(sessions: dict, guild_id: int) -> list:
+    return list(sessions[guild_id]["queue"])
+
+
+def test_round_trip_replays_every_queue_op(journal):
+    rows = [_row(index) for index in range(8)]
+    journal.record("session", 1, voice=10, text=20, author=30)
+    for row in rows[:5]:
+        journal.record("append", 1, t=row)
+    journal.record("appendleft", 1, t=rows[5])
+    journal.record("insert", 1, i=2, t=rows[6])
+    journal.record("move", 1, i=0, j=4)
+    journal.record("remove", 1, i=1)
+    journal.record("next", 1)
+    journal.record("started", 1, at=1000.0)
+    journal.record("position", 1, s=42.5)
+    journal.flush()
+
+    expected = [rows[5], *rows[:5]]
+    expected.insert(2, rows[6])
+    expected.insert(4, expected.pop(0))
+    expected.pop(1)
+    now = expected.pop(0)
+
+    session = journal.load()[1]
+    assert session["session"] == {"voice": 10, "text": 20, "author": 30}
+    assert list(session["queue"]) == expected
+    assert session["now"] == now
+    assert session["started"] == 1000.0
+    assert session["position"] == 42.5
+
+
+def test_replace_shuffle_and_clear(journal):
+    rows = [_row(index) for index in range(6)]
+    for row in rows:
+        journal.record("append", 1, t=row)
+    journal.record("shuffle", 1, seed=1234)
+    journal.record("append", 2, t=rows[0])
+    journal.record("replace", 2, q=rows[3:])
+    journal.record("append", 3, t=rows[0])
+    journal.record("clear", 3)
+    journal.flush()
+
+    sessions = journal.load()
+    assert _queue(sessions, 1) == permute(rows, 1234)
+    assert _queue(sessions, 2) == rows[3:]
+    assert _queue(sessions, 3) == []
+
+
+def test_now_resets_playback_position(journal):
+    journal.record("append", 1, t=_row(0))
+    journal.record("position", 1, s=30)
+    journal.record("now", 1, t=_row(9))
+    journal.flush()
+
+    session = journal.load()[1]
+    assert session["now"] == _row(9)
+    assert session["position"] is None
+    assert _queue({1: session}, 1) == [_row(0)]
+
+
+def test_end_drops_the_session(journal):
+    journal.record("append", 1, t=_row(0))
+    journal.record("end", 1)
+    journal.record("append", 2, t=_row(1))
+    journal.flush()
+
+    assert list(journal.load()) == [2]
+
+
+def test_randomized_ops_match_list_model(journal):
+    rng = random.Random(7)
+    model = []
+    counter = 0
+    for _ in range(2000):
+        choice = rng.random()
+        if choice < 0.35 or not model:
+            row = _row(counter)
+            counter += 1
+            if rng.random() < 0.2:
+                model.insert(0, row)
+                journal.record("appendleft", 1, t=row)
+            else:
+                model.append(row)
+                journal.record("append", 1, t=row)
+        elif choice < 0.5:
+            row = _row(counter)
+            counter += 1
+            index = rng.randrange(len(model) + 1)
+            model.insert(index, row)
+            journal.record("insert", 1, i=index, t=row)
+        elif choice < 0.65:
+            index = rng.randrange(len(model))
+            model.pop(index)
+            journal.record("remove", 1, i=index)
+        elif choice < 0.8:
+            source, target = rng.randrange(len(model)), rng.randrange(len(model))
+            model.insert(target, model.pop(source))
+            journal.record("move", 1, i=source, j=target)
+        elif choice < 0.97:
+            model.pop(0)
+            journal.record("next", 1)
+        else:
+            seed = rng.getrandbits(64)
+            model = permute(model, seed)
+            journal.record("shuffle", 1, seed=seed)
+        if rng.random() < 0.05:
+            journal.flush()
+    journal.flush()
+
+    assert _queue(journal.load(), 1) == model
+
+
+def test_compaction_keeps_records_made_while_compacting(journal):
+    rows = [_row(index) for index in range(4)]
+    for row in rows[:2]:
+        journal.record("append", 1, t=row)
+    journal.record("append", 2, t=rows[3])
+    journal.flush()
+
+    journal.begin_compaction()
+    journal.record("snapshot", 1, session={"voice": 10}, q=rows[:2], now=None, s=None)
+    journal.record("append", 1, t=rows[2])
+    assert journal.flush() == 0
+    journal.rewrite(journal.finish_compaction())
+    journal.record("remove", 1, i=0)
+    journal.flush()
+
+    sessions = journal.load()
+    assert list(sessions) == [1]
+    assert sessions[1]["session"] == {"voice": 10}
+    assert _queue(sessions, 1) == rows[1:3]
+
+
+def test_aborted_compaction_flushes_to_the_existing_log(journal):
+    journal.record("append", 1, t=_row(0))
+    journal.flush()
+
+    journal.begin_compaction()
+    journal.record("append", 1, t=_row(1))
+    journal.abort_compaction()
+    journal.flush()
+
+    assert _queue(journal.load(), 1) == [_row(0), _row(1)]
+
+
+def test_invalid_lines_are_skipped(journal):
+    journal.record("append", 1, t=_row(0))
+    journal.flush()
+    with open(journal.path, "a", encoding="utf-8") as log_file:
+        log_file.write("{truncated\n")
+    journal.record("append", 1, t=_row(1))
+    journal.flush()
+
+    assert _queue(journal.load(), 1) == [_row(0), _row(1)]
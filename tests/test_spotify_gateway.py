@@ -0,0 +1,128 @@
+import asyncio
+import time
+import pytest
+
+pytest.importorskip("spotipy")
+
+from spotipy.exceptions import SpotifyException
+from fake_spotify import FakeSpotify
+from spotify_gateway import IdBatcher, SpotifyGateway, TokenBucket
+
+
+@pytest.fixture
+def spotify():
+    server = FakeSpotify().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def gateway(spotify):
+    return spotify.attach(SpotifyGateway("client-id", "client-secret"))
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=3)
+        started_at = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = time.monotonic() - started_at
+        for _ in range(2):
+            await bucket.acquire()
+        return burst, time.monotonic() - started_at
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.05
+    assert total >= 0.09
+
+
+def test_token_bucket_pause_delays_acquire():
+    async def run():
+        bucket = TokenBucket(rate=100, capacity=10)
+        bucket.pause(0.2)
+        started_at = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_id_batcher_coalesces_concurrent_lookups():
+    calls = []
+
+    async def fetch(ids):
+        calls.append(ids)
+        return [{"id": item_id} for item_id in ids if item_id != "missing"]
+
+    async def run():
+        batcher = IdBatcher(fetch, max_batch=50)
+        return await asyncio.gather(*(batcher.get(item_id) for item_id in ("a", "b", "a", "missing")))
+
+    results = asyncio.run(run())
+    assert calls == [["a", "b", "missing"]]
+    assert results == [{"id": "a"}, {"id": "b"}, {"id": "a"}, None]
+
+
+def test_id_batcher_splits_at_max_batch():
+    calls = []
+
+    async def fetch(ids):
+        calls.append(ids)
+        return [{"id": item_id} for item_id in ids]
+
+    async def run():
+        batcher = IdBatcher(fetch, max_batch=2)
+        return await asyncio.gather(*(batcher.get(item_id) for item_id in "abcde"))
+
+    results = asyncio.run(run())
+    assert [len(batch) for batch in calls] == [2, 2, 1]
+    assert [item["id"] for item in results] == list("abcde")
+
+
+def test_id_batcher_propagates_fetch_errors():
+    async def fetch(ids):
+        raise RuntimeError("boom")
+
+    async def run():
+        batcher = IdBatcher(fetch, max_batch=50)
+        return await asyncio.gather(batcher.get("a"), batcher.get("b"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+
+def test_gateway_batches_track_lookups(spotify, gateway):
+    spotify.add_tracks("a", "b", "c")
+
+    async def run():
+        return await asyncio.gather(*(gateway.track(track_id) for track_id in ("a", "b", "c", "x")))
+
+    results = asyncio.run(run())
+    assert [track["id"] if track else None for track in results] == ["a", "b", "c", None]
+    assert spotify.hits["/v1/tracks"] == 1
+    assert spotify.requests[-1][1]["ids"] == "a,b,c,x"
+
+
+def test_gateway_honours_retry_after(spotify, gateway):
+    spotify.add_tracks("a")
+    spotify.rate_limit("/v1/search", times=1, retry_after=1)
+
+    async def run():
+        started_at = time.monotonic()
+        items = await gateway.search_tracks("Track a")
+        return items, time.monotonic() - started_at
+
+    items, elapsed = asyncio.run(run())
+    assert [item["id"] for item in items] == ["a"]
+    assert spotify.hits["/v1/search"] == 2
+    assert elapsed >= 0.95
+
+
+def test_gateway_gives_up_after_max_retries(spotify, gateway):
+    spotify.rate_limit("/v1/search", times=10, retry_after=0)
+
+    with pytest.raises(SpotifyException) as error:
+        asyncio.run(gateway.search_tracks("Track a"))
+
+    assert error.value.http_status == 429
+    assert spotify.hits["/v1/search"] == SpotifyGateway.MAX_RETRIES + 1
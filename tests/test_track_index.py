@@ -0,0 +1,58 @@
+from track_index import TrackIndex, normalize
+
+
+def _track(title: str, artist: str, url: str, source: str = "youtube") -> dict:
+    return {"title": title, "artist": artist, "url": url, "source": source}
+
+
+def test_normalize_strips_accents_and_video_tags():
+    assert normalize("Canción (Official Video) – Bébé") == "cancion bebe"
+    assert normalize("Song [HD Remaster]") == "song"
+    assert normalize(None) == ""
+
+
+def test_lookup_matches_variants_of_the_same_track():
+    index = TrackIndex()
+    track = _track("Despacito", "Luis Fonsi", "https://example.com/1")
+    index.add(track)
+
+    assert index.lookup("despacito luis fonsi") is track
+    assert index.lookup("Despacito (Official Video) - Luis Fonsi") is track
+    assert index.lookup("despacito remix") is None
+
+
+def test_lookup_filters_by_source():
+    index = TrackIndex()
+    index.add(_track("Despacito", "Luis Fonsi", "https://example.com/1", source="spotify"))
+
+    assert index.lookup("despacito luis fonsi", source="youtube") is None
+    assert index.lookup("despacito luis fonsi", source="spotify")["url"] == "https://example.com/1"
+
+
+def test_alias_makes_the_original_query_match():
+    index = TrackIndex()
+    track = _track("Bohemian Rhapsody - Remastered 2011", "Queen", "https://example.com/2")
+    index.add(track, alias="queen greatest song")
+
+    assert index.lookup("queen greatest song") is track
+
+
+def test_add_skips_tracks_without_url_and_repeated_keys():
+    index = TrackIndex()
+    track = _track("Song", "Artist", "https://example.com/3")
+
+    assert index.add({"title": "No url"}) is False
+    assert index.add(track) is True
+    assert index.add(track) is False
+    assert index.add(track, alias="another name") is True
+    assert len(index) == 1
+
+
+def test_common_tokens_are_not_used_as_candidates():
+    index = TrackIndex()
+    index.MAX_POSTING_SIZE = 2
+    for number in range(3):
+        index.add(_track(f"love {number}", "band", f"https://example.com/{number}"))
+
+    assert index.lookup("love band") is None
+    assert index.lookup("love 1 band")["url"] == "https://example.com/1"
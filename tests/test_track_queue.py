@@ -0,0 +1,195 @@
+import asyncio
+import random
+import pytest
+from track_queue import SpillStore, TieredQueue, TrackQueue, permute
+from tracks import Track
+
+
+def _track(index: int) -> Track:
+    return Track.create(f"Song {index}", f"https://example.com/{index}", 60 + index)
+
+
+def _urls(items) -> list:
+    return [item.url for item in items]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SpillStore(str(tmp_path / "spill.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_track_queue_matches_list_model():
+    rng = random.Random(21)
+    queue = TrackQueue()
+    model = []
+    for counter in range(5000):
+        choice = rng.random()
+        if choice < 0.3 or not model:
+            if rng.random() < 0.2:
+                queue.appendleft(counter)
+                model.insert(0, counter)
+            else:
+                queue.append(counter)
+                model.append(counter)
+        elif choice < 0.45:
+            index = rng.randrange(-len(model) - 2, len(model) + 3)
+            queue.insert(index, counter)
+            model.insert(index, counter)
+        elif choice < 0.6:
+            index = rng.randrange(-len(model), len(model))
+            assert queue.pop(index) == model.pop(index)
+        elif choice < 0.75:
+            source, target = rng.randrange(len(model)), rng.randrange(len(model))
+            assert queue.move(source, target) == model[source]
+            model.insert(target, model.pop(source))
+        elif choice < 0.9:
+            assert queue.popleft() == model.pop(0)
+        else:
+            index = rng.randrange(-len(model), len(model))
+            assert queue[index] == model[index]
+
+        assert len(queue) == len(model)
+    assert list(queue) == model
+
+
+def test_track_queue_slice_clamps_bounds():
+    queue = TrackQueue(range(10))
+
+    assert queue.slice(3, 6) == [3, 4, 5]
+    assert queue.slice(-5, 2) == [0, 1]
+    assert queue.slice(8, 50) == [8, 9]
+    assert queue.slice(6, 3) == []
+    assert [queue.slice(start, start + 4) for start in range(0, 10, 4)] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_track_queue_insert_clamps_like_list():
+    for index in (-20, -3, 0, 2, 5, 20):
+        queue = TrackQueue(range(5))
+        model = list(range(5))
+        queue.insert(index, "x")
+        model.insert(index, "x")
+        assert list(queue) == model
+
+
+def test_track_queue_empty_pops_raise():
+    queue = TrackQueue()
+
+    with pytest.raises(IndexError):
+        queue.popleft()
+    with pytest.raises(IndexError):
+        queue.pop(0)
+    with pytest.raises(IndexError):
+        TrackQueue([1])[1]
+    assert not queue
+
+
+@pytest.mark.parametrize("hot_size", [1, 2, 3, 7])
+def test_tiered_queue_matches_list_model(store, hot_size):
+    async def run():
+        rng = random.Random(hot_size)
+        queue = TieredQueue(store, hot_size)
+        model = []
+        counter = 0
+        for _ in range(1500):
+            choice = rng.random()
+            if choice < 0.3 or not model:
+                item = _track(counter)
+                counter += 1
+                if rng.random() < 0.2:
+                    await queue.appendleft(item)
+                    model.insert(0, item)
+                else:
+                    await queue.append(item)
+                    model.append(item)
+            elif choice < 0.45:
+                item = _track(counter)
+                counter += 1
+                index = rng.randrange(-len(model) - 2, len(model) + 3)
+                await queue.insert(index, item)
+                model.insert(index, item)
+            elif choice < 0.6:
+                index = rng.randrange(-len(model), len(model))
+                assert (await queue.pop(index)).url == model.pop(index).url
+            elif choice < 0.75:
+                source, target = rng.randrange(len(model)), rng.randrange(len(model))
+                assert (await queue.move(source, target)).url == model[source].url
+                model.insert(target, model.pop(source))
+            elif choice < 0.88:
+                assert (await queue.popleft()).url == model.pop(0).url
+            elif choice < 0.91:
+                seed = rng.getrandbits(64)
+                await queue.shuffle(seed)
+                model = permute(model, seed)
+            elif choice < 0.92:
+                await queue.clear()
+                model = []
+            else:
+                start = rng.randrange(len(model) + 2)
+                assert _urls(await queue.slice(start, start + 5)) == _urls(model[start:start + 5])
+                index = rng.randrange(len(model))
+                assert (await queue.get(index)).url == model[index].url
+
+            assert len(queue) == len(model)
+            assert queue.hot or not queue.cold_length
+            assert len(queue.hot) <= hot_size
+        return [row[1] for row in await queue.dump()], _urls(model)
+
+    dumped, expected = asyncio.run(run())
+    assert dumped == expected
+
+
+def test_extend_spills_past_the_hot_window(store):
+    async def run():
+        queue = TieredQueue(store, 3)
+        await queue.extend(_track(index) for index in range(10))
+        return queue, await queue.slice(0, 10)
+
+    queue, items = asyncio.run(run())
+    assert len(queue.hot) == 3
+    assert queue.cold_length == 7
+    assert _urls(items) == _urls(_track(index) for index in range(10))
+
+
+def test_cold_inserts_renumber_when_the_gap_runs_out(store):
+    async def run():
+        queue = TieredQueue(store, 1)
+        await queue.extend([_track(0), _track(1), _track(2)])
+        for index in range(3, 40):
+            await queue.insert(2, _track(index))
+        return await queue.slice(0, len(queue))
+
+    items = asyncio.run(run())
+    assert _urls(items) == _urls([_track(0), _track(1), *(_track(index) for index in range(39, 2, -1)), _track(2)])
+
+
+def test_peek_only_reads_the_hot_window(store):
+    async def run():
+        queue = TieredQueue(store, 2)
+        await queue.extend(_track(index) for index in range(5))
+        return queue.peek(5)
+
+    assert _urls(asyncio.run(run())) == _urls([_track(0), _track(1)])
+
+
+def test_popleft_if_only_takes_the_expected_head(store):
+    async def run():
+        queue = TieredQueue(store, 2)
+        head, other = _track(0), _track(1)
+        await queue.extend([head, other])
+        return await queue.popleft_if(other), await queue.popleft_if(head), _urls(queue.peek(2))
+
+    assert asyncio.run(run()) == (False, True, [_track(1).url])
+
+
+def test_discarded_queue_drops_its_cold_rows(store):
+    async def run():
+        queue = TieredQueue(store, 1)
+        await queue.extend(_track(index) for index in range(5))
+        queue.discard()
+        with pytest.raises(IndexError):
+            await queue.extend(_track(index) for index in range(5, 8))
+        return await store.run(store.rows, queue._id)
+
+    assert asyncio.run(run()) == []
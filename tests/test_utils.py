@@ -0,0 +1,36 @@
+from tracks import Track
+from utils import create_queue_embed
+
+
+def _tracks(count: int) -> list:
+    return [Track.create(f"Song {index}", f"https://example.com/{index}", 60 + index) for index in range(count)]
+
+
+def test_queue_embed_renders_tracks():
+    embed = create_queue_embed(_tracks(3))
+
+    assert "**Song 0**" in embed.description
+    assert "**Song 2**" in embed.description
+    assert "Total: 3" in embed.footer.text
+
+
+def test_queue_embed_renders_dict_songs_without_title():
+    embed = create_queue_embed([{"duration": 30}, {"title": "Named", "duration": 90}])
+
+    assert "**Unknown**" in embed.description
+    assert "**Named**" in embed.description
+
+
+def test_queue_embed_renders_presliced_page():
+    songs = _tracks(20)
+    embed = create_queue_embed(songs[8:16], page=2, total=len(songs))
+
+    assert embed.description.startswith("` 9.` **Song 8**")
+    assert "Página 2/3" in embed.footer.text
+
+
+def test_queue_embed_slices_full_list():
+    embed = create_queue_embed(_tracks(20), page=3)
+
+    assert embed.description.count("\n") == 4
+    assert "**Song 16**" in embed.description
@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+_BRACKETED = re.compile(r"[\(\[][^\)\]]*(official|lyric|audio|video|visualizer|hd|4k|remaster)[^\)\]]*[\)\]]", re.I)
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = _BRACKETED.sub(' ', text.lower())
+    return ' '.join(_NON_WORD.sub(' ', text).replace('_', ' ').split())
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class TrackIndex:
+    MAX_CANDIDATES = 50
+    MAX_POSTING_SIZE = 5000
+
+    def __init__(self, threshold: float = 0.85):
+        self.threshold = threshold
+        self.tracks = {}
+        self._keys = defaultdict(set)
+        self._postings = defaultdict(set)
+
+    def add(self, track: dict, alias: str = None) -> bool:
+        url = track.get('url')
+        if not url:
+            return False
+
+        keys = {normalize(f"{track['title']} {track.get('artist') or ''}")}
+        if alias:
+            keys.add(normalize(alias))
+        keys.discard('')
+
+        new_keys = keys - self._keys[url]
+        if url in self.tracks and not new_keys:
+            return False
+
+        self.tracks[url] = track
+        self._keys[url] |= new_keys
+        for key in new_keys:
+            for token in key.split():
+                self._postings[token].add(url)
+        return True
+
+    def lookup(self, query: str, source: str = None):
+        normalized = normalize(query)
+        if not normalized:
+            return None
+
+        hits = Counter()
+        for token in set(normalized.split()):
+            posting = self._postings.get(token)
+            if posting and len(posting) <= self.MAX_POSTING_SIZE:
+                hits.update(posting)
+
+        query_grams = trigrams(normalized)
+        best_score, best_track = 0.0, None
+        for url, _ in hits.most_common(self.MAX_CANDIDATES):
+            track = self.tracks[url]
+            if source and track.get('source') != source:
+                continue
+
+            score = max(similarity(query_grams, trigrams(key)) for key in self._keys[url])
+            if score > best_score:
+                best_score, best_track = score, track
+
+        if best_score >= self.threshold:
+            return best_track
+        return None
+
+    def __len__(self):
+        return len(self.tracks)
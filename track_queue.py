@@ -0,0 +1,487 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from tracks import Track
+
+
+def permute(items, seed: int) -> list:
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return items
+
+
+class _Node:
+    __slots__ = ('item', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, item):
+        self.item = item
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, count: int):
+    if node is None:
+        return None, None
+
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        _update(node)
+        return left, node
+
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    _update(node)
+    return node, right
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class TrackQueue:
+    def __init__(self, items=()):
+        self._root = None
+        for item in items:
+            self.append(item)
+
+    def _index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return index
+
+    def _node_at(self, index: int) -> _Node:
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def append(self, item):
+        self._root = _merge(self._root, _Node(item))
+
+    def appendleft(self, item):
+        self._root = _merge(_Node(item), self._root)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def insert(self, index: int, item):
+        size = len(self)
+        if index < 0:
+            index = max(index + size, 0)
+        left, right = _split(self._root, min(index, size))
+        self._root = _merge(_merge(left, _Node(item)), right)
+
+    def pop(self, index: int = -1):
+        index = self._index(index)
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        return node.item
+
+    def popleft(self):
+        if self._root is None:
+            raise IndexError("pop from an empty queue")
+        return self.pop(0)
+
+    def move(self, source: int, target: int):
+        item = self.pop(source)
+        self.insert(target, item)
+        return item
+
+    def slice(self, start: int, stop: int) -> list:
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+
+        items = []
+        stack = []
+        node = self._root
+        skip = start
+        while node:
+            left_size = _size(node.left)
+            if skip < left_size:
+                stack.append(node)
+                node = node.left
+            elif skip == left_size:
+                stack.append(node)
+                break
+            else:
+                skip -= left_size + 1
+                node = node.right
+
+        while stack and len(items) < stop - start:
+            node = stack.pop()
+            items.append(node.item)
+            node = node.right
+            while node:
+                stack.append(node)
+                node = node.left
+        return items
+
+    def clear(self):
+        self._root = None
+
+    def __getitem__(self, index: int):
+        return self._node_at(self._index(index)).item
+
+    def __iter__(self):
+        stack = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.item
+            node = node.right
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __bool__(self):
+        return self._root is not None
+
+
+class SpillStore:
+    SPACING = 1 << 32
+    MAX_POSITION = 1 << 62
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="queue-spill")
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("DROP TABLE IF EXISTS spilled_tracks")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queued_tracks ("
+            "queue_id INTEGER NOT NULL, pos INTEGER NOT NULL, payload TEXT NOT NULL, "
+            "PRIMARY KEY (queue_id, pos))"
+        )
+        self._conn.execute("DELETE FROM queued_tracks")
+
+    def new_queue_id(self) -> int:
+        return next(self._ids)
+
+    async def run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(method, *args))
+
+    def submit(self, method, *args):
+        self._executor.submit(method, *args)
+
+    def _bounds(self, queue_id: int):
+        return self._conn.execute(
+            "SELECT MIN(pos), MAX(pos) FROM queued_tracks WHERE queue_id = ?", (queue_id,)
+        ).fetchone()
+
+    def _put(self, queue_id: int, first_pos: int, items: list):
+        self._conn.executemany(
+            "INSERT INTO queued_tracks (queue_id, pos, payload) VALUES (?, ?, ?)",
+            [
+                (queue_id, first_pos + offset * self.SPACING, json.dumps(item.pack(), separators=(',', ':')))
+                for offset, item in enumerate(items)
+            ]
+        )
+
+    def _payloads(self, queue_id: int) -> list:
+        rows = self._conn.execute(
+            "SELECT payload FROM queued_tracks WHERE queue_id = ? ORDER BY pos", (queue_id,)
+        )
+        return [payload for payload, in rows]
+
+    def _rewrite(self, queue_id: int, payloads: list):
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM queued_tracks WHERE queue_id = ?", (queue_id,))
+        self._conn.executemany(
+            "INSERT INTO queued_tracks (queue_id, pos, payload) VALUES (?, ?, ?)",
+            [(queue_id, (offset + 1) * self.SPACING, payload) for offset, payload in enumerate(payloads)]
+        )
+        self._conn.execute("COMMIT")
+
+    def push_back(self, queue_id: int, items: list):
+        _, last = self._bounds(queue_id)
+        if last is not None and last + self.SPACING * len(items) > self.MAX_POSITION:
+            self._rewrite(queue_id, self._payloads(queue_id))
+            _, last = self._bounds(queue_id)
+        self._put(queue_id, (last or 0) + self.SPACING, items)
+
+    def push_front(self, queue_id: int, items: list):
+        first, _ = self._bounds(queue_id)
+        if first is not None and first - self.SPACING * len(items) < -self.MAX_POSITION:
+            self._rewrite(queue_id, self._payloads(queue_id))
+            first, _ = self._bounds(queue_id)
+        self._put(queue_id, (first or 0) - self.SPACING * len(items), items)
+
+    def insert(self, queue_id: int, index: int, item):
+        if index == 0:
+            return self.push_front(queue_id, [item])
+
+        neighbours = [pos for pos, in self._conn.execute(
+            "SELECT pos FROM queued_tracks WHERE queue_id = ? ORDER BY pos LIMIT 2 OFFSET ?",
+            (queue_id, index - 1)
+        )]
+        if len(neighbours) < 2:
+            return self.push_back(queue_id, [item])
+
+        before, after = neighbours
+        if after - before < 2:
+            self._rewrite(queue_id, self._payloads(queue_id))
+            return self.insert(queue_id, index, item)
+        self._put(queue_id, (before + after) // 2, [item])
+
+    def pop(self, queue_id: int, index: int):
+        row = self._conn.execute(
+            "SELECT pos, payload FROM queued_tracks WHERE queue_id = ? ORDER BY pos LIMIT 1 OFFSET ?",
+            (queue_id, index)
+        ).fetchone()
+        if row is None:
+            raise IndexError("queue index out of range")
+        self._conn.execute("DELETE FROM queued_tracks WHERE queue_id = ? AND pos = ?", (queue_id, row[0]))
+        return Track.unpack(json.loads(row[1]))
+
+    def range(self, queue_id: int, start: int, count: int) -> list:
+        rows = self._conn.execute(
+            "SELECT payload FROM queued_tracks WHERE queue_id = ? ORDER BY pos LIMIT ? OFFSET ?",
+            (queue_id, count, start)
+        )
+        return [Track.unpack(json.loads(payload)) for payload, in rows]
+
+    def take(self, queue_id: int, count: int) -> list:
+        rows = self._conn.execute(
+            "SELECT pos, payload FROM queued_tracks WHERE queue_id = ? ORDER BY pos LIMIT ?",
+            (queue_id, count)
+        ).fetchall()
+        if rows:
+            self._conn.execute("DELETE FROM queued_tracks WHERE queue_id = ? AND pos <= ?", (queue_id, rows[-1][0]))
+        return [Track.unpack(json.loads(payload)) for _, payload in rows]
+
+    def rows(self, queue_id: int) -> list:
+        return [json.loads(payload) for payload in self._payloads(queue_id)]
+
+    def shuffle(self, queue_id: int, seed: int):
+        self._rewrite(queue_id, permute(self._payloads(queue_id), seed))
+
+    def delete(self, queue_id: int):
+        self._conn.execute("DELETE FROM queued_tracks WHERE queue_id = ?", (queue_id,))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+class TieredQueue:
+    def __init__(self, store: SpillStore, hot_size: int = 100):
+        self.hot = TrackQueue()
+        self.hot_size = hot_size
+        self.cold_length = 0
+        self.closed = False
+        self._store = store
+        self._id = store.new_queue_id()
+        self._lock = asyncio.Lock()
+
+    async def _run(self, method, *args):
+        result = await self._store.run(method, self._id, *args)
+        if self.closed:
+            self._store.submit(self._store.delete, self._id)
+            raise IndexError("queue closed")
+        return result
+
+    async def _trim(self):
+        overflow = len(self.hot) - self.hot_size
+        if overflow > 0:
+            items = [self.hot.pop() for _ in range(overflow)][::-1]
+            self.cold_length += overflow
+            await self._run(self._store.push_front, items)
+
+    async def _refill(self):
+        if not self.cold_length:
+            return
+        if self.hot and len(self.hot) >= max(self.hot_size // 2, 1):
+            return
+        count = min(max(self.hot_size, 1) - len(self.hot), self.cold_length)
+        items = await self._run(self._store.take, count)
+        self.hot.extend(items)
+        self.cold_length -= len(items)
+
+    def _index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return index
+
+    async def _insert(self, index: int, item) -> int:
+        size = len(self)
+        if index < 0:
+            index = max(index + size, 0)
+        index = min(index, size)
+        if index <= len(self.hot):
+            self.hot.insert(index, item)
+            await self._trim()
+        else:
+            self.cold_length += 1
+            await self._run(self._store.insert, index - len(self.hot), item)
+        return index
+
+    async def _pop(self, index: int):
+        index = self._index(index)
+        if index < len(self.hot):
+            item = self.hot.pop(index)
+        else:
+            item = await self._run(self._store.pop, index - len(self.hot))
+            self.cold_length -= 1
+        await self._refill()
+        return item
+
+    async def append(self, item):
+        async with self._lock:
+            if self.cold_length or len(self.hot) >= self.hot_size:
+                self.cold_length += 1
+                await self._run(self._store.push_back, [item])
+            else:
+                self.hot.append(item)
+
+    async def extend(self, items):
+        async with self._lock:
+            items = list(items)
+            if not self.cold_length:
+                room = max(self.hot_size - len(self.hot), 0)
+                self.hot.extend(items[:room])
+                items = items[room:]
+            if items:
+                self.cold_length += len(items)
+                await self._run(self._store.push_back, items)
+
+    async def appendleft(self, item):
+        async with self._lock:
+            self.hot.appendleft(item)
+            await self._trim()
+
+    async def popleft(self):
+        async with self._lock:
+            await self._refill()
+            item = self.hot.popleft()
+            await self._refill()
+            return item
+
+    async def popleft_if(self, item) -> bool:
+        async with self._lock:
+            if not self.hot or self.hot[0] is not item:
+                return False
+            self.hot.popleft()
+            await self._refill()
+            return True
+
+    async def insert(self, index: int, item) -> int:
+        async with self._lock:
+            return await self._insert(index, item)
+
+    async def pop(self, index: int = -1):
+        async with self._lock:
+            return await self._pop(index)
+
+    async def move(self, source: int, target: int):
+        async with self._lock:
+            item = await self._pop(source)
+            await self._insert(target, item)
+            return item
+
+    async def get(self, index: int):
+        async with self._lock:
+            index = self._index(index)
+            if index < len(self.hot):
+                return self.hot[index]
+            return (await self._run(self._store.range, index - len(self.hot), 1))[0]
+
+    async def slice(self, start: int, stop: int) -> list:
+        async with self._lock:
+            hot_length = len(self.hot)
+            items = self.hot.slice(start, stop)
+            cold_start = max(start, hot_length) - hot_length
+            cold_stop = min(stop - hot_length, self.cold_length)
+            if cold_stop > cold_start:
+                items.extend(await self._run(self._store.range, cold_start, cold_stop - cold_start))
+            return items
+
+    async def dump(self) -> list:
+        async with self._lock:
+            rows = [item.pack() for item in self.hot]
+            if self.cold_length:
+                rows.extend(await self._run(self._store.rows))
+            return rows
+
+    async def shuffle(self, seed: int):
+        async with self._lock:
+            if not self.cold_length:
+                self.hot = TrackQueue(permute(self.hot, seed))
+                return
+            items = list(self.hot)
+            self.hot.clear()
+            self.cold_length += len(items)
+            await self._run(self._store.push_front, items)
+            await self._run(self._store.shuffle, seed)
+            await self._refill()
+
+    async def clear(self):
+        async with self._lock:
+            self.hot.clear()
+            if self.cold_length:
+                self.cold_length = 0
+                await self._run(self._store.delete)
+
+    def peek(self, count: int) -> list:
+        return self.hot.slice(0, count)
+
+    def discard(self):
+        self.closed = True
+        self.hot.clear()
+        self.cold_length = 0
+        self._store.submit(self._store.delete, self._id)
+
+    def __len__(self):
+        return len(self.hot) + self.cold_length
+
+    def __bool__(self):
+        return bool(self.hot) or self.cold_length > 0
@@ -0,0 +1,127 @@
+import sys
+from urllib.parse import urlparse, parse_qs
+from weakref import WeakValueDictionary
+
+YOUTUBE_WATCH_URL = "https://www.youtube.com/watch?v="
+YOUTUBE_THUMBNAIL_URL = "https://i.ytimg.com/vi/"
+
+
+def youtube_id_from_url(url: str):
+    parsed = urlparse(url or '')
+    if parsed.netloc.endswith('youtu.be'):
+        return parsed.path.lstrip('/') or None
+    video_id = parse_qs(parsed.query).get('v')
+    return video_id[0] if video_id else None
+
+
+def youtube_url(video_id: str) -> str:
+    return f"{YOUTUBE_WATCH_URL}{video_id}"
+
+
+class Track:
+    __slots__ = ('title', 'artist', 'duration', 'source', '_ref', '_thumbnail', '__weakref__')
+    FIELDS = ('title', 'url', 'duration', 'thumbnail', 'artist', 'source')
+
+    _interned = WeakValueDictionary()
+
+    def __init__(self, title: str, url: str, duration: int = 0, thumbnail: str = None,
+                 artist: str = None, source: str = 'youtube'):
+        self.title = title
+        self.artist = sys.intern(artist) if artist else artist
+        self.duration = int(duration or 0)
+        self.source = sys.intern(source or 'youtube')
+        self._ref = self._compact_url(url or '')
+        self._thumbnail = self._compact_thumbnail(thumbnail)
+
+    def _compact_url(self, url: str) -> str:
+        video_id = youtube_id_from_url(url)
+        if video_id and youtube_url(video_id) == url:
+            return video_id
+        return url
+
+    def _compact_thumbnail(self, thumbnail: str):
+        if not thumbnail:
+            return None
+        prefix = f"{YOUTUBE_THUMBNAIL_URL}{self._ref}/"
+        if '://' not in self._ref and thumbnail.startswith(prefix):
+            return sys.intern(thumbnail[len(prefix):])
+        return thumbnail
+
+    @classmethod
+    def create(cls, title: str, url: str, duration: int = 0, thumbnail: str = None,
+               artist: str = None, source: str = 'youtube') -> 'Track':
+        track = cls(title, url, duration, thumbnail, artist, source)
+        if not track._ref:
+            return track
+
+        key = (track.source, track._ref)
+        existing = cls._interned.get(key)
+        if existing is None:
+            cls._interned[key] = track
+            return track
+        if existing._same_metadata(track):
+            return existing
+        return track
+
+    def _same_metadata(self, other: 'Track') -> bool:
+        return (
+            self.title == other.title
+            and self.artist == other.artist
+            and self.duration == other.duration
+            and self._thumbnail == other._thumbnail
+        )
+
+    @classmethod
+    def from_dict(cls, data) -> 'Track':
+        if isinstance(data, cls):
+            return data
+        return cls.create(
+            data.get('title') or 'Unknown',
+            data.get('url'),
+            data.get('duration'),
+            data.get('thumbnail'),
+            data.get('artist'),
+            data.get('source')
+        )
+
+    @classmethod
+    def unpack(cls, row: list) -> 'Track':
+        title, url, duration, thumbnail, artist, source = row
+        return cls.create(title, url, duration, thumbnail, artist, source)
+
+    @property
+    def video_id(self):
+        if self._ref and '://' not in self._ref:
+            return self._ref
+        return None
+
+    @property
+    def url(self) -> str:
+        if self.video_id:
+            return youtube_url(self._ref)
+        return self._ref
+
+    @property
+    def thumbnail(self):
+        if self._thumbnail and '://' not in self._thumbnail:
+            return f"{YOUTUBE_THUMBNAIL_URL}{self._ref}/{self._thumbnail}"
+        return self._thumbnail
+
+    def pack(self) -> list:
+        return [self.title, self.url, self.duration, self.thumbnail, self.artist, self.source]
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"Track({self.title!r}, {self.url!r})"
@@ -2,6 +2,7 @@ import discord
 from config import COLORS
 from typing import Optional
 from datetime import datetime
+from tracks import Track
 
 def create_now_playing_embed(title: str, artist: str, duration: int, thumbnail: Optional[str] = None, requester = None, progress: int = 0, total: int = 0) -> discord.Embed:
     embed = discord.Embed(
@@ -28,7 +29,7 @@ def create_now_playing_embed(title: str, artist: str, duration: int, thumbnail:
     
     return embed
 
-def create_queue_embed(songs: list, page: int = 1) -> discord.Embed:
+def create_queue_embed(songs: list, page: int = 1, total: int = None) -> discord.Embed:
     embed = discord.Embed(
         title="🎵 Cola de reproducción",
         color=COLORS["primary"]
@@ -41,20 +42,23 @@ def create_queue_embed(songs: list, page: int = 1) -> discord.Embed:
     
     start = (page - 1) * 8
     end = start + 8
+    if total is None:
+        total = len(songs)
+        songs = songs[start:end]
     
     description = ""
-    for i, song in enumerate(songs[start:end], start=start+1):
-        duration = format_duration(song.get('duration', 0)) if isinstance(song, dict) else format_duration(song[5] if len(song) > 5 else 0)
-        title = song.get('title', song[0]) if isinstance(song, dict) else song[0]
+    for i, song in enumerate(songs, start=start+1):
+        duration = format_duration(song.get('duration', 0)) if isinstance(song, (dict, Track)) else format_duration(song[5] if len(song) > 5 else 0)
+        title = song.get('title', 'Unknown') if isinstance(song, (dict, Track)) else song[0]
         description += f"`{i:2d}.` **{title[:45]}** | {duration}\n"
     
     embed.description = description
     
-    total_pages = (len(songs) - 1) // 8 + 1
+    total_pages = (total - 1) // 8 + 1
     if total_pages > 1:
-        embed.set_footer(text=f"Página {page}/{total_pages} • Total: {len(songs)} canciones • Hecho por flexyng")
+        embed.set_footer(text=f"Página {page}/{total_pages} • Total: {total} canciones • Hecho por flexyng")
     else:
-        embed.set_footer(text=f"Total: {len(songs)} canción(es) • Hecho por flexyng")
+        embed.set_footer(text=f"Total: {total} canción(es) • Hecho por flexyng")
     
     return embed
 
@@ -195,6 +199,7 @@ def create_help_embed() -> discord.Embed:
 `/shuffle` - Activa/desactiva shuffle
 `/loop` - Cambia modo de repetición
 `/volume <0-100>` - Ajusta volumen
+`/crossfade <segundos>` - Mezcla el final de cada canción con la siguiente
 `/nowplaying` - Canción actual
 """,
         inline=False